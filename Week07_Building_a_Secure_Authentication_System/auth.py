@@ -1,22 +1,65 @@
 import bcrypt
+import hashlib
+import math
 import os
 import secrets
 import time
-
-sessions = {}
+from collections import OrderedDict
+from password_blocklist import is_breached_password
+from rate_limiter import LoginRateLimiter
+
+# sha256(token) -> {"username", "created_at", "last_seen"}, oldest use first
+sessions = OrderedDict()
+SESSION_IDLE_TTL = 30 * 60
+SESSION_ABSOLUTE_TTL = 8 * 60 * 60
+MAX_SESSIONS = 10000
 USER_DATA_FILE = "users.txt"
+# Built with: python password_blocklist.py build <list.txt> breached_passwords.bin
+BREACHED_PASSWORDS_FILE = "breached_passwords.bin"
+
+# In-memory index of users.txt: username -> (password_hash, role)
+user_index = {}
+# (mtime_ns, size) of users.txt when user_index was last built
+user_index_stamp = None
 
-wrong_attempts = {}
 LOCK_DURATION = 300
 MAX_ATTEMPTS = 3
+# Set to a file path to keep rate limits across restarts
+RATE_LIMIT_DB = None
+
+# MAX_ATTEMPTS tries per user, refilled over LOCK_DURATION seconds
+login_limiter = LoginRateLimiter(
+    user_capacity=MAX_ATTEMPTS,
+    user_refill_seconds=LOCK_DURATION,
+    db_path=RATE_LIMIT_DB,
+)
+
+# bcrypt cost for new hashes; calibrate_bcrypt_rounds() can pick it per machine
+BCRYPT_ROUNDS = 12
+BCRYPT_TARGET_MS = 150
+
+
+def calibrate_bcrypt_rounds(target_ms=BCRYPT_TARGET_MS, min_rounds=10, max_rounds=16):
+    # Time one hash at min_rounds; every extra round doubles the work
+    password = b"calibration-password"
+    salt = bcrypt.gensalt(rounds=min_rounds)
+
+    elapsed_ms = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        bcrypt.hashpw(password, salt)
+        elapsed_ms = min(elapsed_ms, (time.perf_counter() - start) * 1000)
+
+    extra_rounds = round(math.log2(target_ms / max(elapsed_ms, 0.001)))
+    return max(min_rounds, min(max_rounds, min_rounds + extra_rounds))
 
 
 def hash_password(plain_text_password):
     # Encode the password to bytes (bcrypt requires byte strings)
     password_in_bytes = plain_text_password.encode('utf-8')
 
-    # Generate a salt using bcrypt.gensalt()
-    salt = bcrypt.gensalt()
+    # Generate a salt using bcrypt.gensalt() at the configured cost
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
 
     # Hash the password using bcrypt.hashpw()
     hashed_pass = bcrypt.hashpw(password_in_bytes, salt)
@@ -45,52 +88,87 @@ def register_user(username, password, role="user"):
     # Hash the password
     hashed = hash_password(password)
 
+    # Only patch the index in place if it was up to date before our append,
+    # otherwise let the next lookup reload the whole file
+    index_was_current = get_file_stamp() == user_index_stamp
+
     # Append new user to file in format: username,hash
     with open(USER_DATA_FILE, "a") as file:
         file.write(f"{username},{hashed},{role}\n")
 
+    if index_was_current:
+        update_user_index(username, hashed, role)
+
     print(f"Success: User ''{username}' registered as '{role}' Successfully.")
     return True
 
 
-def user_exists(username):
-    # If file does not exist → no users yet
-    if not os.path.exists(USER_DATA_FILE):
-        return False
+def get_file_stamp():
+    # (mtime, size) identifies the current version of users.txt
+    try:
+        stat = os.stat(USER_DATA_FILE)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
 
-    # Read file and check each line
-    with open(USER_DATA_FILE, "r") as file:
-        for line in file:
-            stored_username = line.strip().split(",")[0]  # username is before the comma
-            if stored_username == username:
-                return True
 
-    return False
+def load_user_index():
+    global user_index, user_index_stamp
 
+    stamp = get_file_stamp()
+    if stamp is None:
+        user_index = {}
+        user_index_stamp = None
+        return user_index
 
-def login_user(username, password):
-    if not os.path.exists(USER_DATA_FILE):
-        print("Error: No users are registered yet.")
-        return False
+    # Reuse the index until the file changes on disk
+    if stamp == user_index_stamp:
+        return user_index
 
+    index = {}
     with open(USER_DATA_FILE, "r") as file:
         for line in file:
             parts = line.strip().split(",")
             if len(parts) < 2:
                 continue
 
-            stored_username = parts[0]
-            stored_hash = parts[1]
+            role = parts[2] if len(parts) > 2 else "user"
+            # Keep the first entry like the old line-by-line scan did
+            index.setdefault(parts[0], (parts[1], role))
+
+    user_index = index
+    user_index_stamp = stamp
+    return user_index
+
 
-            if stored_username == username:
-                if verify_password(password, stored_hash):
-                    print(f"Success: Welcome '{username}'!.")
-                    return True
-                else:
-                    print("Error: Invalid password.")
-                    return False
+def update_user_index(username, hashed_password, role):
+    global user_index_stamp
 
-    print("Error: Username not found.")
+    user_index.setdefault(username, (hashed_password, role))
+    user_index_stamp = get_file_stamp()
+
+
+def user_exists(username):
+    # Served from the cached index; missing file means no users yet
+    return username in load_user_index()
+
+
+def login_user(username, password):
+    if not os.path.exists(USER_DATA_FILE):
+        print("Error: No users are registered yet.")
+        return False
+
+    entry = load_user_index().get(username)
+    if entry is None:
+        print("Error: Username not found.")
+        return False
+
+    stored_hash = entry[0]
+    if verify_password(password, stored_hash):
+        print(f"Success: Welcome '{username}'!.")
+        return True
+
+    print("Error: Invalid password.")
     return False
 
 
@@ -114,6 +192,9 @@ def validate_password(password):
     if not any(c.isalpha() for c in password):
         return False, "Password must contain at least one letter."
 
+    if is_breached_password(password, BREACHED_PASSWORDS_FILE):
+        return False, "Error: This password has appeared in a data breach, choose another."
+
     return True, ""
 
 
@@ -146,45 +227,64 @@ def check_password_strength(password):
         return "Strong"
 
 
-def login_user_with_lock(username, password):
-    if username in wrong_attempts:
-        count, lock_time = wrong_attempts[username]
-        if count >= MAX_ATTEMPTS:
-            if time.time() - lock_time < LOCK_DURATION:
-                print(f"Account '{username}' is locked. Try again later.")
-                return False
-            else:
-                # Reset after lock duration
-                wrong_attempts[username] = (0, 0)
+def login_user_with_lock(username, password, source="console"):
+    # Throttle before touching users.txt or bcrypt, so flooding attempts
+    # (even for usernames that don't exist) cost almost nothing
+    if not login_limiter.allow(username, source):
+        print(f"Too many login attempts for '{username}'. Try again later.")
+        return False
 
     success = login_user(username, password)
 
-    if not success:
-        if username not in wrong_attempts:
-            wrong_attempts[username] = (1, 0)
-        else:
-            count, _ = wrong_attempts[username]
-            if count + 1 >= MAX_ATTEMPTS:
-                wrong_attempts[username] = (count + 1, time.time())
-                print(f"Account' {username}' is now locked for 5 minutes.")
-            else:
-                wrong_attempts[username] = (count + 1, 0)
-    else:
+    if success:
         # Reset on successful login
-        if username in wrong_attempts:
-            wrong_attempts.pop(username)
+        login_limiter.reset_user(username)
 
     return success
 
 
+def hash_token(token):
+    # Sessions are looked up by digest, so raw tokens are never compared
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
 def create_session(username):
     token = secrets.token_hex(16)
-    sessions[username] = token
+    now = time.time()
+    sessions[hash_token(token)] = {"username": username, "created_at": now, "last_seen": now}
+
+    # Evict the least recently used sessions once over the cap
+    while len(sessions) > MAX_SESSIONS:
+        sessions.popitem(last=False)
     return token
 
 
+def validate_session(token):
+    key = hash_token(token)
+    session = sessions.get(key)
+    if session is None:
+        return None
+
+    now = time.time()
+    if (now - session["last_seen"] > SESSION_IDLE_TTL
+            or now - session["created_at"] > SESSION_ABSOLUTE_TTL):
+        del sessions[key]
+        return None
+
+    session["last_seen"] = now
+    sessions.move_to_end(key)
+    return session["username"]
+
+
+def end_session(token):
+    sessions.pop(hash_token(token), None)
+
+
 def main():
+    global BCRYPT_ROUNDS
+
     print("\nWelcome to the Week 7 Authentication System!")
+    BCRYPT_ROUNDS = calibrate_bcrypt_rounds()
 
     while True:
         display_menu()
@@ -229,6 +329,7 @@ def main():
                 token = create_session(username)
                 print(f"\nYou are now logged in. Session token: {token}")
                 input("Press Enter to return to the main menu...")
+                end_session(token)
 
         elif choice == '3':
             print("\nThank you for using the authentication system.")
@@ -239,4 +340,5 @@ def main():
             print("\nError: Invalid option. Please select 1, 2, or 3.")
 
 
-main()
+if __name__ == "__main__":
+    main()
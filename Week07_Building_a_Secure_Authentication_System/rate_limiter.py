@@ -0,0 +1,123 @@
+import hashlib
+import os
+import sqlite3
+import time
+from array import array
+
+
+class TokenBucketTable:
+    # Fixed number of token buckets shared by all keys.
+    # A key is hashed (with a secret salt, so attackers can't aim collisions)
+    # to one slot; keys that collide simply share a bucket. Memory stays at
+    # two doubles per slot however many usernames or sources are seen.
+
+    def __init__(self, name, capacity, refill_per_second, slots, salt, conn=None):
+        self.name = name
+        self.capacity = float(capacity)
+        self.refill_per_second = refill_per_second
+        self.slots = slots
+        self.salt = salt
+        self.conn = conn
+
+        # tokens starts full; updated == 0 means "never used"
+        self.tokens = array('d', [self.capacity]) * slots
+        self.updated = array('d', [0.0]) * slots
+
+        if conn is not None:
+            self.load()
+
+    def slot_for(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=8, key=self.salt).digest()
+        return int.from_bytes(digest, "big") % self.slots
+
+    def refill(self, slot, now):
+        if self.updated[slot]:
+            elapsed = now - self.updated[slot]
+            self.tokens[slot] = min(self.capacity, self.tokens[slot] + elapsed * self.refill_per_second)
+        self.updated[slot] = now
+
+    def peek(self, key, now):
+        slot = self.slot_for(key)
+        self.refill(slot, now)
+        return slot, self.tokens[slot] >= 1
+
+    def take(self, slot):
+        self.tokens[slot] -= 1
+        self.save(slot)
+
+    def reset(self, key):
+        slot = self.slot_for(key)
+        self.tokens[slot] = self.capacity
+        self.updated[slot] = time.time()
+        self.save(slot)
+
+    def load(self):
+        rows = self.conn.execute(
+            "SELECT slot, tokens, updated FROM rate_limit_buckets WHERE name = ? AND slot < ?",
+            (self.name, self.slots)
+        )
+        for slot, tokens, updated in rows:
+            self.tokens[slot] = tokens
+            self.updated[slot] = updated
+
+    def save(self, slot):
+        if self.conn is None:
+            return
+        self.conn.execute(
+            "INSERT OR REPLACE INTO rate_limit_buckets (name, slot, tokens, updated) VALUES (?, ?, ?, ?)",
+            (self.name, slot, self.tokens[slot], self.updated[slot])
+        )
+        self.conn.commit()
+
+
+class LoginRateLimiter:
+    # Per-username and per-source token buckets for login attempts.
+    # Call allow() before doing any user lookup or bcrypt work.
+    # With db_path the buckets (and the hashing salt) are kept in SQLite so
+    # limits survive a restart; the table never exceeds `slots` rows per kind.
+
+    def __init__(self, user_capacity=3, user_refill_seconds=300,
+                 source_capacity=20, source_refill_seconds=60,
+                 slots=65536, db_path=None):
+        conn = None
+        salt = os.urandom(16)
+
+        if db_path is not None:
+            conn = sqlite3.connect(db_path)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+                    name TEXT NOT NULL,
+                    slot INTEGER NOT NULL,
+                    tokens REAL NOT NULL,
+                    updated REAL NOT NULL,
+                    PRIMARY KEY (name, slot)
+                )
+            """)
+            conn.execute("CREATE TABLE IF NOT EXISTS rate_limit_meta (key TEXT PRIMARY KEY, value BLOB)")
+            # Reuse the stored salt so keys map to the same slots after restart
+            conn.execute("INSERT OR IGNORE INTO rate_limit_meta (key, value) VALUES ('salt', ?)", (salt,))
+            conn.commit()
+            salt = conn.execute("SELECT value FROM rate_limit_meta WHERE key = 'salt'").fetchone()[0]
+
+        self.users = TokenBucketTable(
+            "user", user_capacity, user_capacity / user_refill_seconds, slots, salt, conn
+        )
+        self.sources = TokenBucketTable(
+            "source", source_capacity, source_capacity / source_refill_seconds, slots, salt, conn
+        )
+
+    def allow(self, username, source):
+        # Both buckets must have a token; only then is one taken from each
+        now = time.time()
+        user_slot, user_ok = self.users.peek(username, now)
+        source_slot, source_ok = self.sources.peek(source, now)
+        if not (user_ok and source_ok):
+            return False
+
+        self.users.take(user_slot)
+        self.sources.take(source_slot)
+        return True
+
+    def reset_user(self, username):
+        # A successful login gives the user their full allowance back
+        self.users.reset(username)
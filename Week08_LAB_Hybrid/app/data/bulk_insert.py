@@ -0,0 +1,74 @@
+DEFAULT_CHUNK_SIZE = 50000
+
+
+def frame_to_rows(df, columns, constants=()):
+    """
+    Turn `df` into a list of tuples in `columns` order, one column at a time
+    (no per-row pandas work). Missing columns become NULL, and so do NaN
+    values; numpy scalars come out as plain Python values. Each value in
+    `constants` is appended to every row.
+    """
+    data = []
+    for column in columns:
+        if column not in df.columns:
+            data.append([None] * len(df))
+            continue
+        values = df[column]
+        if values.hasnans:
+            values = values.astype(object).where(values.notna(), None)
+        data.append(values.tolist())
+    for value in constants:
+        data.append([value] * len(df))
+    return list(zip(*data))
+
+
+def bulk_insert_df(conn, table, columns, df, required=(), chunk_size=DEFAULT_CHUNK_SIZE,
+                   timestamp_column="created_at"):
+    """
+    INSERT OR IGNORE every row of `df` into `table` with executemany, in
+    chunks of `chunk_size` rows, all inside one transaction (rolled back if
+    anything fails).
+
+    Unless `df` has its own, `timestamp_column` is filled with one
+    CURRENT_TIMESTAMP taken at the start of the load; letting SQLite work
+    out the column default for every row costs about a third of the insert
+    time.
+
+    Returns:
+        tuple: (inserted, ignored) - rows actually added, and rows skipped
+               because they clashed with a UNIQUE constraint
+    """
+    missing = [column for column in required if column not in df.columns]
+    if missing:
+        raise KeyError(f"{table} data is missing column(s): {', '.join(missing)}")
+
+    data_columns = list(columns)
+    constants = ()
+    if timestamp_column and timestamp_column not in data_columns:
+        if timestamp_column in df.columns:
+            data_columns.append(timestamp_column)
+        else:
+            constants = (conn.execute("SELECT CURRENT_TIMESTAMP").fetchone()[0],)
+    insert_columns = data_columns + ([timestamp_column] if constants else [])
+
+    sql = (
+        f"INSERT OR IGNORE INTO {table} ({', '.join(insert_columns)}) "
+        f"VALUES ({', '.join('?' * len(insert_columns))})"
+    )
+    cursor = conn.cursor()
+    inserted = 0
+    own_transaction = not conn.in_transaction
+    if own_transaction:
+        cursor.execute("BEGIN")
+    try:
+        for start in range(0, len(df), chunk_size):
+            cursor.executemany(sql, frame_to_rows(df.iloc[start:start + chunk_size], data_columns, constants))
+            # rowcount only counts rows really inserted, not ignored ones
+            inserted += cursor.rowcount
+        if own_transaction:
+            conn.commit()
+    except Exception:
+        if own_transaction:
+            conn.rollback()
+        raise
+    return inserted, len(df) - inserted
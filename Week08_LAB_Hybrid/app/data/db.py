@@ -1,8 +1,121 @@
+import os
 import sqlite3
+import sys
 from pathlib import Path
 DB_PATH = Path("DATA") / "intelligence_platform.db"
 
-def connect_database(db_path=DB_PATH):
-    return sqlite3.connect(str(db_path))
+# Named connection profiles. All of them use WAL so readers never wait on
+# the writer; they differ in how hard each commit is pushed to disk and how
+# much memory the connection may use.
+#   dashboard    read-heavy pages: big page cache and memory-mapped reads
+#   bulk_ingest  one-off CSV / user loads: no fsync, largest cache
+#   safe_oltp    everyday writes (logins, CRUD): fsync on every commit
+CONNECTION_PROFILES = {
+    "dashboard": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -65536,        # KiB, i.e. 64 MB
+        "mmap_size": 268435456,      # 256 MB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,        # ms
+    },
+    "bulk_ingest": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -262144,       # 256 MB
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+        "busy_timeout": 30000,
+    },
+    "safe_oltp": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16384,        # 16 MB
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 5000,
+    },
+}
 
+# The profile used when none is passed; set DB_PROFILE to change it
+DEFAULT_PROFILE = "safe_oltp"
 
+SYNCHRONOUS_NAMES = {0: "OFF", 1: "NORMAL", 2: "FULL", 3: "EXTRA"}
+TEMP_STORE_NAMES = {0: "DEFAULT", 1: "FILE", 2: "MEMORY"}
+
+
+def get_profile_name(profile=None):
+    name = profile or os.environ.get("DB_PROFILE") or DEFAULT_PROFILE
+    if name not in CONNECTION_PROFILES:
+        raise ValueError(
+            f"Unknown database profile '{name}'. Choose one of: {', '.join(CONNECTION_PROFILES)}"
+        )
+    return name
+
+
+def apply_profile(conn, profile=None):
+    settings = CONNECTION_PROFILES[get_profile_name(profile)]
+    # busy_timeout first so the journal_mode switch can wait for other writers
+    conn.execute(f"PRAGMA busy_timeout = {int(settings['busy_timeout'])}")
+    conn.execute(f"PRAGMA journal_mode = {settings['journal_mode']}")
+    conn.execute(f"PRAGMA synchronous = {settings['synchronous']}")
+    conn.execute(f"PRAGMA cache_size = {int(settings['cache_size'])}")
+    conn.execute(f"PRAGMA mmap_size = {int(settings['mmap_size'])}")
+    conn.execute(f"PRAGMA temp_store = {settings['temp_store']}")
+    return conn
+
+
+def connect_database(db_path=DB_PATH, profile=None):
+    return apply_profile(sqlite3.connect(str(db_path)), profile)
+
+
+def publish_database(source_path, target_path=DB_PATH):
+    """
+    Make the finished database at source_path live at target_path, then
+    remove source_path.
+
+    If there is no live database yet the file is renamed into place
+    (os.replace is atomic). Otherwise its pages are copied into the live
+    database with SQLite's backup API in one step. A rename over a live WAL
+    database would pair the new file with the old -wal/-shm files, whereas
+    the backup commits as a single transaction: open readers finish on
+    their current snapshot and see the new data on their next read.
+    """
+    source_path, target_path = Path(source_path), Path(target_path)
+    if not target_path.exists():
+        os.replace(source_path, target_path)
+        return
+
+    source = sqlite3.connect(str(source_path))
+    target = connect_database(target_path)
+    try:
+        source.backup(target)
+    finally:
+        source.close()
+        target.close()
+    os.remove(source_path)
+
+
+def describe_connection(conn):
+    """Return the settings actually in effect on `conn`."""
+    def pragma(name):
+        return conn.execute(f"PRAGMA {name}").fetchone()[0]
+
+    return {
+        "journal_mode": pragma("journal_mode").upper(),
+        "synchronous": SYNCHRONOUS_NAMES.get(pragma("synchronous")),
+        "cache_size": pragma("cache_size"),
+        "mmap_size": pragma("mmap_size"),
+        "temp_store": TEMP_STORE_NAMES.get(pragma("temp_store")),
+        "busy_timeout": pragma("busy_timeout"),
+    }
+
+
+if __name__ == "__main__":
+    # python -m app.data.db [profile]  -> print the settings a connection gets
+    profile = get_profile_name(sys.argv[1] if len(sys.argv) > 1 else None)
+    conn = connect_database(profile=profile)
+    print(f"Profile: {profile}")
+    for key, value in describe_connection(conn).items():
+        print(f"  {key:13} {value}")
+    conn.close()
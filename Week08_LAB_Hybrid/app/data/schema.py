@@ -1,3 +1,48 @@
+import re
+import sys
+from app.data.db import DB_PATH, connect_database
+from app.data.search import search_statements
+from app.data.summaries import SUMMARY_TABLES, summary_statements
+from app.data.timestamps import epoch_statements
+
+# Secondary indexes, one step per schema version, matched to the queries in
+# incidents.py, tickets.py and datasets.py. Each step is applied once, in
+# order, and recorded in PRAGMA user_version (see migrate_indexes). Never
+# change a step that has shipped; add a new version instead.
+INDEX_MIGRATIONS = [
+    (1, "page by created_at", [
+        # Keyset pages newest-first by created_at without sorting the table
+        "CREATE INDEX IF NOT EXISTS idx_cyber_incidents_created_at ON cyber_incidents(created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_datasets_metadata_created_at ON datasets_metadata(created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_it_tickets_created_at ON it_tickets(created_at, id)",
+    ]),
+    (2, "filter and group-by indexes", [
+        # GROUP BY incident_type (counts, HAVING): covering, no table reads
+        "CREATE INDEX IF NOT EXISTS idx_cyber_incidents_type ON cyber_incidents(incident_type)",
+        # WHERE severity = ? GROUP BY status: covering
+        "CREATE INDEX IF NOT EXISTS idx_cyber_incidents_severity_status ON cyber_incidents(severity, status)",
+        # WHERE status = ? (page filters, open counts)
+        "CREATE INDEX IF NOT EXISTS idx_cyber_incidents_status ON cyber_incidents(status)",
+        # GROUP BY status / WHERE status = ?
+        "CREATE INDEX IF NOT EXISTS idx_it_tickets_status ON it_tickets(status)",
+        # WHERE priority = ? ORDER BY created_at: no sort step
+        "CREATE INDEX IF NOT EXISTS idx_it_tickets_priority_created_at ON it_tickets(priority, created_at)",
+        # GROUP BY assigned_to: covering
+        "CREATE INDEX IF NOT EXISTS idx_it_tickets_assigned_to ON it_tickets(assigned_to)",
+        # GROUP BY category: covering
+        "CREATE INDEX IF NOT EXISTS idx_datasets_metadata_category ON datasets_metadata(category)",
+        # WHERE file_size_mb > ? ORDER BY file_size_mb: range scan, no sort step
+        "CREATE INDEX IF NOT EXISTS idx_datasets_metadata_file_size ON datasets_metadata(file_size_mb)",
+    ]),
+    # Trigger-maintained counts for the dashboard (see summaries.py)
+    (3, "summary tables", summary_statements()),
+    # FTS5 indexes over incident and ticket text (see search.py)
+    (4, "full-text search", search_statements()),
+    # Indexed Unix-time companions of the date columns (see timestamps.py)
+    (5, "epoch time columns", epoch_statements()),
+]
+SCHEMA_VERSION = INDEX_MIGRATIONS[-1][0]
+
 def create_users_table(conn):
     cursor = conn.cursor()
     create_sqlTable1 = """
@@ -76,14 +121,196 @@ def create_it_tickets_table(conn):
     conn.commit()
     print("✔ it_tickets table created successfully.")
 
-def create_all_tables(conn):
+def create_ingest_watermarks_table(conn):
+    cursor = conn.cursor()
+
+    # How far each CSV file has been ingested (see app/services/csv_ingest.py)
+    create_sql = """
+        CREATE TABLE IF NOT EXISTS ingest_watermarks (
+            filename TEXT PRIMARY KEY,
+            table_name TEXT NOT NULL,
+            byte_offset INTEGER NOT NULL,
+            row_count INTEGER NOT NULL,
+            content_hash TEXT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    """
+
+    cursor.execute(create_sql)
+    conn.commit()
+    print("✔ ingest_watermarks table created successfully.")
+
+def create_ingest_quarantine_table(conn):
+    cursor = conn.cursor()
+
+    # CSV rows rejected at ingestion (e.g. unparseable dates), kept as JSON
+    create_sql = """
+        CREATE TABLE IF NOT EXISTS ingest_quarantine (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            filename TEXT NOT NULL,
+            table_name TEXT NOT NULL,
+            row_data TEXT NOT NULL,
+            reason TEXT NOT NULL,
+            quarantined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    """
+
+    cursor.execute(create_sql)
+    conn.commit()
+    print("✔ ingest_quarantine table created successfully.")
+
+def get_schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate_indexes(conn):
+    """
+    Apply every INDEX_MIGRATIONS step newer than the database's
+    user_version. Each step runs in its own short write transaction that
+    also bumps user_version, so readers carry on meanwhile (WAL) and a
+    step interrupted halfway is simply run again next time. Safe to call
+    on every start-up, from several processes at once.
+
+    Returns:
+        int: the schema version after migrating
+    """
+    for version, description, statements in INDEX_MIGRATIONS:
+        if version <= get_schema_version(conn):
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have applied it while we waited for the lock
+            if get_schema_version(conn) >= version:
+                conn.rollback()
+                continue
+            for sql in statements:
+                conn.execute(sql)
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        print(f"✔ Schema migration {version} applied ({description}).")
+    # Refresh planner statistics for the new indexes
+    conn.execute("PRAGMA optimize")
+    return get_schema_version(conn)
+
+
+def create_all_tables(conn, migrate=True):
+    """
+    Create every table, then (unless migrate=False) bring the indexes up
+    to date. Bulk loads pass migrate=False and call migrate_indexes()
+    afterwards, since building an index once is cheaper than keeping it
+    up to date row by row.
+    """
     create_users_table(conn)
     create_cyber_incidents_table(conn)
     create_datasets_metadata_table(conn)
     create_it_tickets_table(conn)
+    create_ingest_watermarks_table(conn)
+    create_ingest_quarantine_table(conn)
     print("✅ Users table created successfully!")
+    if migrate:
+        migrate_indexes(conn)
 
 
+def shipped_queries():
+    """
+    (name, function) for every query function the pages call, each taking
+    only a connection. Paged queries start from a cursor so they show the
+    plan used for every page after the first.
+    """
+    from app.data import incidents, tickets, datasets
+    from app.data.pagination import encode_cursor
+
+    by_id = encode_cursor("id", None, 2 ** 62)
+    by_created = encode_cursor("created_at", "9999-12-31", 2 ** 62)
+    return [
+        ("get_incidents_by_type_count", incidents.get_incidents_by_type_count),
+        ("get_high_severity_by_status", incidents.get_high_severity_by_status),
+        ("get_incident_types_with_many_cases", incidents.get_incident_types_with_many_cases),
+        ("get_incidents_page (status)",
+         lambda conn: incidents.get_incidents_page(conn, by_id, filters={"status": "Open"})),
+        ("get_incidents_page (created_at)",
+         lambda conn: incidents.get_incidents_page(conn, by_created, order_by="created_at")),
+        ("get_ticket_count_by_status", tickets.get_ticket_count_by_status),
+        ("get_high_priority_tickets", tickets.get_high_priority_tickets),
+        ("get_assigned_ticket_counts", tickets.get_assigned_ticket_counts),
+        ("get_tickets_page (status)",
+         lambda conn: tickets.get_tickets_page(conn, by_id, filters={"status": "Open"})),
+        ("get_tickets_page (created_at)",
+         lambda conn: tickets.get_tickets_page(conn, by_created, order_by="created_at")),
+        ("get_dataset_count_by_category", datasets.get_dataset_count_by_category),
+        ("get_large_datasets", datasets.get_large_datasets),
+        ("get_datasets_page (category)",
+         lambda conn: datasets.get_datasets_page(conn, by_id, filters={"category": "Security"})),
+        ("get_datasets_page (created_at)",
+         lambda conn: datasets.get_datasets_page(conn, by_created, order_by="created_at")),
+        ("search_incidents", lambda conn: incidents.search_incidents(conn, "phish")),
+        ("search_tickets", lambda conn: tickets.search_tickets(conn, "password reset")),
+        ("get_incident_counts_by_type_between",
+         lambda conn: incidents.get_incident_counts_by_type_between(conn, "2024-01-01", "2024-02-01")),
+        ("get_incidents_between",
+         lambda conn: incidents.get_incidents_between(conn, "2024-01-01", "2024-02-01")),
+        ("get_tickets_created_between",
+         lambda conn: tickets.get_tickets_created_between(conn, "2024-01-01", "2024-02-01")),
+        ("get_tickets_resolved_between",
+         lambda conn: tickets.get_tickets_resolved_between(conn, "2024-01-01", "2024-02-01")),
+        ("get_datasets_updated_between",
+         lambda conn: datasets.get_datasets_updated_between(conn, "2024-01-01", "2024-02-01")),
+    ]
+
+
+# A plan step that reads a table without any index: "SCAN <table>" with no
+# "USING ..." (covering index scans and rowid searches are fine). Summary
+# tables are exempt: they hold one row per group, reading them is the point.
+FULL_SCAN_RE = re.compile(r"^SCAN (\w+)$")
 
 
+def check_query_plans(conn):
+    """
+    Run each shipped query, capture the SQL it sends (with its parameters
+    filled in) and look at its EXPLAIN QUERY PLAN.
+
+    Returns:
+        list: (name, plan steps, full scans) per query; a query is fine
+        when its full scans list is empty
+    """
+    results = []
+    for name, query in shipped_queries():
+        statements = []
+        conn.set_trace_callback(statements.append)
+        try:
+            query(conn)
+        finally:
+            conn.set_trace_callback(None)
+        steps = []
+        for sql in statements:
+            if not sql.lstrip().upper().startswith("SELECT"):
+                continue
+            steps += [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+        full_scans = [
+            step for step in steps
+            if FULL_SCAN_RE.match(step) and FULL_SCAN_RE.match(step).group(1) not in SUMMARY_TABLES
+        ]
+        results.append((name, steps, full_scans))
+    return results
+
 
+if __name__ == "__main__":
+    # python -m app.data.schema          create tables and apply index migrations
+    # python -m app.data.schema --check  confirm every shipped query uses an index
+    conn = connect_database(DB_PATH)
+    if "--check" in sys.argv[1:]:
+        print(f"Schema version {get_schema_version(conn)} (latest {SCHEMA_VERSION})")
+        failures = 0
+        for name, steps, full_scans in check_query_plans(conn):
+            failures += bool(full_scans)
+            print(f"{'❌' if full_scans else '✅'} {name}")
+            for step in steps:
+                print(f"     {step}")
+        conn.close()
+        sys.exit(1 if failures else 0)
+    create_all_tables(conn)
+    print(f"Schema version {get_schema_version(conn)}")
+    conn.close()
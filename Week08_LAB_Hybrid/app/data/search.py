@@ -0,0 +1,156 @@
+"""
+Full-text search over incident descriptions and ticket text.
+
+Each searchable table has an FTS5 index stored as an external-content
+table: the index keeps only the tokens and reads the text itself from the
+base table, so nothing is stored twice. Triggers on the base table update
+the index on every INSERT, DELETE and UPDATE of the indexed columns. The
+index also keeps 2- and 3-character prefixes, so search-as-you-type
+prefix queries are lookups rather than scans. Words are not stemmed:
+a stemmer would also stem the typed prefix ("pay" -> "pai") and break
+prefix matching.
+
+Results are ranked by BM25 (ticket subjects weigh more than their
+description) and come with a snippet of the best-matching text, matches
+wrapped in ** so they show in bold in Markdown.
+
+The tables and triggers are created by schema migration 4 (see
+INDEX_MIGRATIONS in schema.py).
+"""
+import re
+from app.data.pagination import PAGEABLE_COLUMNS, _check_column
+
+# base table -> FTS5 table, indexed columns and their BM25 weights
+SEARCH_INDEXES = {
+    "cyber_incidents": {
+        "fts": "cyber_incidents_fts",
+        "columns": ("description",),
+        "weights": (1.0,),
+    },
+    "it_tickets": {
+        "fts": "it_tickets_fts",
+        "columns": ("subject", "description"),
+        "weights": (4.0, 1.0),
+    },
+}
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 500
+SNIPPET_TOKENS = 12
+
+# Words as FTS5's unicode61 tokenizer sees them, with an optional trailing *
+SEARCH_TERM_RE = re.compile(r"(\w+)(\*?)", re.UNICODE)
+
+
+def search_statements():
+    """
+    CREATE VIRTUAL TABLE / CREATE TRIGGER statements for every index, then
+    the statements filling them from the current base tables.
+    """
+    statements = []
+    for table, index in SEARCH_INDEXES.items():
+        fts, columns = index["fts"], index["columns"]
+        new_values = ", ".join(f"NEW.{column}" for column in columns)
+        old_values = ", ".join(f"OLD.{column}" for column in columns)
+        insert_row = f"INSERT INTO {fts} (rowid, {', '.join(columns)}) VALUES (NEW.id, {new_values});"
+        delete_row = (
+            f"INSERT INTO {fts} ({fts}, rowid, {', '.join(columns)}) "
+            f"VALUES ('delete', OLD.id, {old_values});"
+        )
+        statements += [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+            f"{', '.join(columns)}, content='{table}', content_rowid='id', "
+            f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+            f"CREATE TRIGGER IF NOT EXISTS trg_{fts}_insert AFTER INSERT ON {table} "
+            f"BEGIN {insert_row} END",
+            f"CREATE TRIGGER IF NOT EXISTS trg_{fts}_delete AFTER DELETE ON {table} "
+            f"BEGIN {delete_row} END",
+            f"CREATE TRIGGER IF NOT EXISTS trg_{fts}_update AFTER UPDATE OF {', '.join(columns)} ON {table} "
+            f"BEGIN {delete_row} {insert_row} END",
+            # Make ORDER BY rank use the column weights
+            f"INSERT INTO {fts} ({fts}, rank) VALUES "
+            f"('rank', 'bm25({', '.join(str(weight) for weight in index['weights'])})')",
+            f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')",
+        ]
+    return statements
+
+
+def to_match_query(text, prefix_last=True):
+    """
+    Turn what a user typed into a safe FTS5 MATCH expression.
+
+    Every word must appear (in any column); a word typed with a trailing *
+    matches as a prefix, and with prefix_last=True so does the last word,
+    for search-as-you-type. FTS5 operators and punctuation in the input
+    are treated as plain text, so no input can make the query invalid.
+
+    Returns:
+        str: the MATCH expression, or None if the text has no words
+    """
+    terms = SEARCH_TERM_RE.findall(text or "")
+    if not terms:
+        return None
+    parts = []
+    for position, (word, star) in enumerate(terms):
+        prefix = star or (prefix_last and position == len(terms) - 1)
+        parts.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(parts)
+
+
+def build_search_query(table, text, columns=None, filters=None,
+                       limit=DEFAULT_SEARCH_LIMIT, prefix_last=True):
+    """
+    Build the SQL and parameters for a ranked search of `table`.
+
+    The selected columns are followed by the BM25 score (lower is a better
+    match) and a highlighted snippet. filters maps column -> value or
+    list of values, as for pagination. Returns (None, None) if the text
+    has nothing to search for.
+    """
+    if table not in SEARCH_INDEXES:
+        raise ValueError(f"Table '{table}' has no search index")
+    match = to_match_query(text, prefix_last)
+    if match is None:
+        return None, None
+    fts = SEARCH_INDEXES[table]["fts"]
+    columns = list(columns or PAGEABLE_COLUMNS[table])
+    for column in columns:
+        _check_column(table, column)
+    limit = max(1, min(int(limit), MAX_SEARCH_LIMIT))
+
+    where = [f"{fts} MATCH ?"]
+    params = [match]
+    for column, value in (filters or {}).items():
+        _check_column(table, column)
+        if isinstance(value, (list, tuple, set)):
+            values = list(value)
+            if not values:
+                where.append("0")
+                continue
+            where.append(f"t.{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        else:
+            where.append(f"t.{column} = ?")
+            params.append(value)
+
+    sql = (
+        f"SELECT {', '.join(f't.{column}' for column in columns)}, {fts}.rank, "
+        f"snippet({fts}, -1, '**', '**', '…', {SNIPPET_TOKENS}) "
+        f"FROM {fts} JOIN {table} AS t ON t.id = {fts}.rowid "
+        f"WHERE {' AND '.join(where)} "
+        f"ORDER BY {fts}.rank LIMIT ?"
+    )
+    params.append(limit)
+    return sql, params
+
+
+def search(conn, table, text, columns=None, filters=None, limit=DEFAULT_SEARCH_LIMIT, prefix_last=True):
+    """
+    Ranked full-text search of `table`, best match first.
+
+    Returns:
+        list: rows of the selected columns + (score, snippet)
+    """
+    sql, params = build_search_query(table, text, columns, filters, limit, prefix_last)
+    if sql is None:
+        return []
+    return conn.execute(sql, params).fetchall()
@@ -1,17 +1,20 @@
 import pandas as pd
+from app.data.bulk_insert import DEFAULT_CHUNK_SIZE, bulk_insert_df
+from app.data.write_queue import execute_write
+from app.data.pagination import PAGEABLE_COLUMNS, DEFAULT_PAGE_SIZE, fetch_page
+from app.data.search import DEFAULT_SEARCH_LIMIT, search
+from app.data.timestamps import to_epoch
 
 def insert_ticket(conn, ticket_id, subject, priority, status, category=None,
                   description=None, created_date=None, assigned_to=None):
     try:
-        cursor = conn.cursor()
-
         query = """
             INSERT INTO it_tickets
             (ticket_id, subject, priority, status, category, description, created_date, assigned_to)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         """
 
-        cursor.execute(query, (
+        cursor = execute_write(conn, query, (
             ticket_id,
             subject,
             priority,
@@ -22,7 +25,6 @@ def insert_ticket(conn, ticket_id, subject, priority, status, category=None,
             assigned_to
         ))
 
-        conn.commit()
         return cursor.lastrowid
 
     except Exception as e:
@@ -38,14 +40,36 @@ def get_all_tickets(conn):
         return pd.DataFrame()
 
 
+def get_tickets_page(conn, cursor=None, page_size=DEFAULT_PAGE_SIZE, filters=None, order_by="id"):
+    """
+    One page of tickets, newest first, as (DataFrame, next_cursor).
+    Pass next_cursor back in to get the following page; it is None on the
+    last page. filters maps column -> value or list of values.
+    """
+    rows, next_cursor = fetch_page(
+        conn, "it_tickets", filters=filters, cursor=cursor,
+        page_size=page_size, order_by=order_by
+    )
+    return pd.DataFrame(rows, columns=PAGEABLE_COLUMNS["it_tickets"]), next_cursor
+
+
+def search_tickets(conn, text, limit=DEFAULT_SEARCH_LIMIT, filters=None):
+    """
+    Tickets whose subject or description matches `text`, best match first
+    (subject matches rank higher), as a DataFrame with a BM25 score and a
+    highlighted snippet. The last word matches as a prefix (see search.py).
+    """
+    rows = search(conn, "it_tickets", text, filters=filters, limit=limit)
+    return pd.DataFrame(rows, columns=[*PAGEABLE_COLUMNS["it_tickets"], "score", "snippet"])
+
+
 def update_ticket_status(conn, ticket_id, new_status):
     try:
-        cursor = conn.cursor()
-        cursor.execute(
+        cursor = execute_write(
+            conn,
             "UPDATE it_tickets SET status = ? WHERE id = ?",
             (new_status, ticket_id)
         )
-        conn.commit()
         return cursor.rowcount
     except Exception as e:
         print(f"Error updating ticket: {e}")
@@ -54,12 +78,11 @@ def update_ticket_status(conn, ticket_id, new_status):
 
 def delete_ticket(conn, ticket_id):
     try:
-        cursor = conn.cursor()
-        cursor.execute(
+        cursor = execute_write(
+            conn,
             "DELETE FROM it_tickets WHERE id = ?",
             (ticket_id,)
         )
-        conn.commit()
         return cursor.rowcount
     except Exception as e:
         print(f"Error deleting ticket: {e}")
@@ -68,9 +91,8 @@ def delete_ticket(conn, ticket_id):
 
 def get_ticket_count_by_status(conn):
     query = """
-    SELECT status, COUNT(*) AS count
-    FROM it_tickets
-    GROUP BY status
+    SELECT status, count
+    FROM ticket_status_counts
     ORDER BY count DESC
     """
     return pd.read_sql_query(query, conn)
@@ -88,39 +110,62 @@ def get_high_priority_tickets(conn):
     return pd.read_sql_query(query, conn)
 
 
+def get_tickets_created_between(conn, start, end):
+    """
+    Tickets created between start and end, oldest first.
+    start/end may be datetimes, dates, ISO strings or Unix seconds (see
+    timestamps.py); the range is start inclusive, end exclusive.
+    """
+    query = """
+    SELECT * FROM it_tickets
+    WHERE created_ts >= ? AND created_ts < ?
+    ORDER BY created_ts
+    """
+    return pd.read_sql_query(query, conn, params=(to_epoch(start), to_epoch(end)))
+
+
+def get_tickets_resolved_between(conn, start, end):
+    """
+    Tickets resolved between start and end, oldest first.
+    start/end may be datetimes, dates, ISO strings or Unix seconds (see
+    timestamps.py); the range is start inclusive, end exclusive.
+    """
+    query = """
+    SELECT * FROM it_tickets
+    WHERE resolved_ts >= ? AND resolved_ts < ?
+    ORDER BY resolved_ts
+    """
+    return pd.read_sql_query(query, conn, params=(to_epoch(start), to_epoch(end)))
+
+
 def get_assigned_ticket_counts(conn):
     query = """
-    SELECT assigned_to, COUNT(*) as count
-    FROM it_tickets
-    GROUP BY assigned_to
+    SELECT assigned_to, count
+    FROM ticket_assignee_counts
     ORDER BY count DESC
     """
     return pd.read_sql_query(query, conn)
 
 
-def insert_ticket_from_df(conn, df):
-    cursor = conn.cursor()
-    count = 0
+IT_TICKETS_COLUMNS = (
+    "ticket_id",
+    "subject",
+    "priority",
+    "status",
+    "category",
+    "description",
+    "created_date",
+    "assigned_to",
+)
+IT_TICKETS_REQUIRED = ("ticket_id", "subject", "priority", "status")
 
-    for _, row in df.iterrows():
-        cursor.execute(
-            """
-            INSERT OR IGNORE INTO it_tickets
-            (ticket_id, subject, priority, status, category, description, created_date, assigned_to)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                row["ticket_id"],
-                row["subject"],
-                row["priority"],
-                row["status"],
-                row.get("category", None),
-                row.get("description", None),
-                row.get("created_date", None),
-                row.get("assigned_to", None)
-            )
-        )
-        count += 1
 
-    conn.commit()
-    return count
\ No newline at end of file
+def insert_ticket_from_df(conn, df, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Bulk-load a DataFrame into it_tickets (see bulk_insert_df).
+    Returns (inserted, ignored) row counts.
+    """
+    return bulk_insert_df(
+        conn, "it_tickets", IT_TICKETS_COLUMNS, df,
+        required=IT_TICKETS_REQUIRED, chunk_size=chunk_size
+    )
\ No newline at end of file
@@ -1,4 +1,5 @@
 from app.data.db import connect_database
+from app.data.write_queue import execute_write
 
 def get_user_by_username(username):
     """Retrieve user by username."""
@@ -15,10 +16,9 @@ def get_user_by_username(username):
 def insert_user(username, password_hash, role='user'):
     """Insert new user."""
     conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute(
+    execute_write(
+        conn,
         "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
         (username, password_hash, role)
     )
-    conn.commit()
     conn.close()
\ No newline at end of file
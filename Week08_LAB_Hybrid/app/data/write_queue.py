@@ -0,0 +1,212 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from app.data.db import apply_profile
+
+# How long the writer keeps gathering more writes after the first one (ms).
+# 0 means it only batches what is already queued.
+DEFAULT_WINDOW_MS = 0.0
+DEFAULT_MAX_BATCH = 256
+
+
+class WriteResult:
+    """What a committed write reports back (the same attributes as a cursor)."""
+
+    def __init__(self, lastrowid, rowcount):
+        self.lastrowid = lastrowid
+        self.rowcount = rowcount
+
+
+class WriteQueue:
+    """
+    The only writer for one database file.
+
+    A background thread owns the write connection. Writes are queued from
+    any thread and come back as futures. The writer takes everything that
+    is waiting (up to max_batch writes), runs it in one transaction with a
+    SAVEPOINT per write, and commits once, so concurrent sessions never
+    fight over SQLite's write lock and a failing write only fails its own
+    caller.
+    """
+
+    def __init__(self, db_path, window_ms=DEFAULT_WINDOW_MS, max_batch=DEFAULT_MAX_BATCH, profile=None):
+        self.db_path = str(db_path)
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        # Autocommit mode: the writer thread issues BEGIN/COMMIT itself
+        self._conn = apply_profile(
+            sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None), profile
+        )
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._writes = 0
+        self._failed = 0
+        self._batches = 0
+        self._total_wait = 0.0
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+        self._thread = threading.Thread(target=self._run, name="write-queue", daemon=True)
+        self._thread.start()
+
+    def submit(self, statements):
+        """
+        Queue one write: a list of (sql, params) statements that must
+        succeed or fail together. The returned future resolves to a
+        WriteResult once the write has been committed.
+        """
+        future = Future()
+        self._queue.put((statements, future, time.perf_counter()))
+        return future
+
+    def execute(self, sql, params=()):
+        """Run one statement through the queue and wait for its commit."""
+        return self.submit([(sql, tuple(params))]).result()
+
+    def stats(self):
+        """
+        Returns:
+            dict: queue depth, writes and batches committed, failed writes,
+            average batch size, and average queue wait / average and
+            maximum submit-to-commit latency in milliseconds
+        """
+        with self._stats_lock:
+            done = self._writes + self._failed
+            return {
+                "queue_depth": self._queue.qsize(),
+                "writes": self._writes,
+                "failed": self._failed,
+                "batches": self._batches,
+                "avg_batch_size": round(done / self._batches, 2) if self._batches else 0.0,
+                "avg_wait_ms": round(1000 * self._total_wait / done, 3) if done else 0.0,
+                "avg_latency_ms": round(1000 * self._total_latency / done, 3) if done else 0.0,
+                "max_latency_ms": round(1000 * self._max_latency, 3),
+            }
+
+    def close(self):
+        """Commit what is queued, then stop the writer thread."""
+        self._queue.put(None)
+        self._thread.join()
+        self._conn.close()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.window
+            stop = False
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        item = self._queue.get(timeout=remaining)
+                    else:
+                        item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._commit_batch(batch)
+            if stop:
+                return
+
+    def _commit_batch(self, batch):
+        started = time.perf_counter()
+        cur = self._conn.cursor()
+        outcomes = []
+        try:
+            cur.execute("BEGIN IMMEDIATE")
+            for statements, future, _ in batch:
+                cur.execute("SAVEPOINT write")
+                try:
+                    rowcount = 0
+                    for sql, params in statements:
+                        cur.execute(sql, params)
+                        rowcount += max(cur.rowcount, 0)
+                    cur.execute("RELEASE write")
+                    outcomes.append(WriteResult(cur.lastrowid, rowcount))
+                except Exception as e:
+                    cur.execute("ROLLBACK TO write")
+                    cur.execute("RELEASE write")
+                    outcomes.append(e)
+            cur.execute("COMMIT")
+        except Exception as e:
+            # BEGIN or COMMIT itself failed: nothing in the batch was written
+            if self._conn.in_transaction:
+                self._conn.rollback()
+            outcomes = [e] * len(batch)
+
+        finished = time.perf_counter()
+        with self._stats_lock:
+            self._batches += 1
+            for (_, _, submitted), outcome in zip(batch, outcomes):
+                if isinstance(outcome, Exception):
+                    self._failed += 1
+                else:
+                    self._writes += 1
+                self._total_wait += started - submitted
+                self._total_latency += finished - submitted
+                self._max_latency = max(self._max_latency, finished - submitted)
+
+        for (_, future, _), outcome in zip(batch, outcomes):
+            if isinstance(outcome, Exception):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+
+
+_write_queues = {}
+_write_queues_lock = threading.Lock()
+
+
+def get_write_queue(db_path, **kwargs):
+    """Return the process-wide WriteQueue for db_path, starting it on first use."""
+    key = os.path.abspath(str(db_path))
+    with _write_queues_lock:
+        if key not in _write_queues:
+            _write_queues[key] = WriteQueue(db_path, **kwargs)
+        return _write_queues[key]
+
+
+def database_file(conn):
+    """Path of the main database behind conn, or "" for an in-memory one."""
+    for _, name, path in conn.execute("PRAGMA database_list"):
+        if name == "main":
+            return path or ""
+    return ""
+
+
+def execute_write(conn, sql, params=()):
+    """
+    Run one INSERT/UPDATE/DELETE for a caller holding conn.
+
+    The statement goes through the database's WriteQueue and returns once
+    it is committed; conn sees the change on its next read.
+
+    If conn already has a transaction open, the statement becomes part of
+    it instead: it runs on conn and is NOT committed. The caller owns that
+    transaction and must commit or roll it back; until then conn holds
+    the write lock and the queue waits behind it, so keep such
+    transactions short. An in-memory database has no queue, so the
+    statement runs on conn and is committed there.
+
+    Returns:
+        cursor-like object with lastrowid and rowcount
+    """
+    path = database_file(conn)
+    if conn.in_transaction:
+        cursor = conn.cursor()
+        cursor.execute(sql, tuple(params))
+        return cursor
+    if not path:
+        cursor = conn.cursor()
+        cursor.execute(sql, tuple(params))
+        conn.commit()
+        return cursor
+    return get_write_queue(path).execute(sql, params)
@@ -0,0 +1,340 @@
+import hashlib
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import pandas as pd
+from app.data.incidents import insert_incident_from_df
+from app.data.tickets import insert_ticket_from_df
+from app.data.datasets import insert_dataset_from_df
+from app.data.timestamps import EPOCH_COLUMNS, is_valid_date
+
+# CSV file -> (table, loader)
+CSV_TABLE_MAPPING = {
+    "cyber_incidents.csv": ("cyber_incidents", insert_incident_from_df),
+    "it_tickets.csv": ("it_tickets", insert_ticket_from_df),
+    "datasets_metadata.csv": ("datasets_metadata", insert_dataset_from_df),
+}
+
+# Alternative header names seen in exports -> column name in the table
+RENAME_RULES = {
+    "cyber_incidents": {
+        "type": "incident_type",
+        "severity_level": "severity",
+        "reportedBy": "reported_by"
+    },
+    "it_tickets": {
+        "ticketID": "ticket_id",
+        "Ticket ID": "ticket_id",
+        "priorityLevel": "priority",
+        "assignedTo": "assigned_to",
+        "createdDate": "created_date",
+        "resolvedDate": "resolved_date"
+    },
+    "datasets_metadata": {
+        "datasetName": "dataset_name",
+        "fileSize": "file_size_mb",
+        "recordCount": "record_count",
+        "lastUpdated": "last_updated"
+    }
+}
+
+# Parse types per table column, so pandas never has to guess (and never
+# guesses differently from one chunk to the next). Columns not listed are
+# read as text.
+CSV_DTYPES = {
+    "datasets_metadata": {
+        "record_count": "Int64",
+        "file_size_mb": "float64",
+    },
+}
+
+DEFAULT_CHUNK_BYTES = 8 * 1024 * 1024
+HASH_BLOCK_BYTES = 1024 * 1024
+
+
+def read_header(path):
+    """Column names from the first line of a CSV file."""
+    with open(path, "rb") as f:
+        first_line = f.readline()
+    try:
+        return list(pd.read_csv(io.BytesIO(first_line), nrows=0).columns)
+    except pd.errors.EmptyDataError:
+        return []
+
+
+def header_end(path):
+    """Byte offset just past the header line."""
+    with open(path, "rb") as f:
+        f.readline()
+        return f.tell()
+
+
+def continues_line(path, offset):
+    """
+    True if the byte at `offset` carries on the line before it, i.e. the
+    last loaded line had no newline yet and more text was added to it.
+    """
+    if offset == 0:
+        return False
+    with open(path, "rb") as f:
+        f.seek(offset - 1)
+        around = f.read(2)
+    return around[:1] != b"\n" and around[1:2] not in (b"\n", b"\r")
+
+
+def hash_file_range(path, start, end, hasher):
+    """Feed bytes [start, end) of a file into `hasher`."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = f.read(min(HASH_BLOCK_BYTES, remaining))
+            if not block:
+                break
+            hasher.update(block)
+            remaining -= len(block)
+    return hasher
+
+
+def split_csv(path, chunk_bytes=DEFAULT_CHUNK_BYTES, start=None, end=None):
+    """
+    Split a CSV file into byte ranges of about chunk_bytes, each starting at
+    the beginning of a line. By default the whole file after its header
+    line is covered; pass start/end (both line starts) for a part of it.
+    Records must be one per line; a quoted field containing a newline could
+    be cut in two.
+
+    Returns:
+        list: (start, end) byte offsets
+    """
+    if start is None:
+        start = header_end(path)
+    if end is None:
+        end = os.path.getsize(path)
+    ranges = []
+    with open(path, "rb") as f:
+        while start < end:
+            f.seek(min(start + chunk_bytes, end))
+            if f.tell() < end:
+                f.readline()
+            chunk_end = min(f.tell(), end)
+            ranges.append((start, chunk_end))
+            start = chunk_end
+    return ranges
+
+
+def plan_file(conn, filename, path, incremental):
+    """
+    Work out which part of a CSV file still needs loading.
+
+    The ingest_watermarks row for the file records how many bytes were
+    loaded last time and a SHA-256 of those bytes. If the file still starts
+    with exactly those bytes, only what was appended since is loaded;
+    otherwise the file was rewritten (or its last, unterminated line was
+    extended) and its table is reloaded in full.
+
+    Returns:
+        dict: mode ("full", "reload", "append" or "unchanged"), start and
+        end byte offsets to load, rows already loaded, and the hash of the
+        file up to `end`
+    """
+    end = os.path.getsize(path)
+    watermark = None
+    if incremental:
+        watermark = conn.execute(
+            "SELECT byte_offset, row_count, content_hash FROM ingest_watermarks WHERE filename = ?",
+            (filename,)
+        ).fetchone()
+
+    hasher = hashlib.sha256()
+    if watermark is not None:
+        offset, row_count, content_hash = watermark
+        if offset <= end and hash_file_range(path, 0, offset, hasher).hexdigest() == content_hash:
+            if offset == end:
+                return {"mode": "unchanged", "start": offset, "end": end,
+                        "rows": row_count, "hash": content_hash}
+            if not continues_line(path, offset):
+                hash_file_range(path, offset, end, hasher)
+                return {"mode": "append", "start": offset, "end": end,
+                        "rows": row_count, "hash": hasher.hexdigest()}
+        hasher = hashlib.sha256()
+
+    start = min(header_end(path), end)
+    return {"mode": "reload" if watermark is not None else "full", "start": start, "end": end,
+            "rows": 0, "hash": hash_file_range(path, 0, end, hasher).hexdigest()}
+
+
+def quarantine_bad_dates(df, table):
+    """
+    Split off the rows whose date columns (EPOCH_COLUMNS) hold something
+    other than an ISO 8601 date; an empty date is fine. Surrounding spaces
+    are stripped from the dates that are kept.
+
+    Returns:
+        tuple: (rows to load, [(row as JSON, reason), ...])
+    """
+    bad = pd.Series(False, index=df.index)
+    reasons = pd.Series("", index=df.index)
+    for column in EPOCH_COLUMNS.get(table, {}):
+        if column not in df.columns:
+            continue
+        df[column] = df[column].str.strip()
+        invalid = {value for value in df[column].dropna().unique()
+                   if value and not is_valid_date(value)}
+        if not invalid:
+            continue
+        rejected = df[column].isin(invalid) & ~bad
+        reasons[rejected] = [f"unparseable {column}: {value!r}" for value in df.loc[rejected, column]]
+        bad |= rejected
+
+    if not bad.any():
+        return df, []
+    records = df[bad].astype(object).where(df[bad].notna(), None).to_dict("records")
+    quarantined = [(json.dumps(record, default=str), reason)
+                   for record, reason in zip(records, reasons[bad])]
+    return df[~bad], quarantined
+
+
+def parse_csv_range(path, start, end, header, table):
+    """
+    Parse one byte range of a CSV file with explicit dtypes, apply the
+    table's rename rules and set aside rows with unparseable dates. Runs
+    in a worker process.
+
+    Returns:
+        tuple: (pd.DataFrame of the rows to load, with table column names,
+        [(row as JSON, reason), ...] for the rows to quarantine)
+    """
+    rename = {old: new for old, new in RENAME_RULES.get(table, {}).items() if old in header}
+    column_types = CSV_DTYPES.get(table, {})
+    dtype = {name: column_types.get(rename.get(name, name), str) for name in header}
+
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    df = pd.read_csv(io.BytesIO(data), header=None, names=header, dtype=dtype)
+    return quarantine_bad_dates(df.rename(columns=rename), table)
+
+
+def ingest_csv_files(conn, csv_dir, mapping=CSV_TABLE_MAPPING, chunk_bytes=DEFAULT_CHUNK_BYTES,
+                     workers=None, incremental=False):
+    """
+    Load every CSV in `mapping` from csv_dir into its table.
+
+    All files are cut into byte-range chunks, and the chunks are parsed
+    concurrently in a process pool, a bounded number ahead of the writer,
+    so memory stays flat whatever the file size. This thread is the only
+    writer: it inserts each parsed chunk (in file order) with the table's
+    bulk loader, all inside a single transaction.
+
+    Rows with a date that isn't ISO 8601 are not loaded; they go to
+    ingest_quarantine with the reason, in the same transaction.
+
+    Each run records a watermark per file in ingest_watermarks. With
+    incremental=True only rows appended since the last run are loaded; a
+    file that was rewritten instead has its table emptied and reloaded.
+
+    Args:
+        conn: Database connection
+        csv_dir: Folder holding the CSV files
+        mapping: CSV file name -> (table, loader)
+        chunk_bytes: Approximate size of each parsed chunk
+        workers: Worker processes for parsing (default: CPU count)
+        incremental: Load only what changed since the last run
+
+    Returns:
+        dict: table -> {"mode", "rows", "inserted", "ignored", "quarantined"}
+    """
+    csv_dir = Path(csv_dir)
+    stats = {}
+    plans = {}
+    tasks = []
+    for filename, (table, insert_func) in mapping.items():
+        path = csv_dir / filename
+        if not path.exists() or path.stat().st_size == 0:
+            print(f"Skipping {filename} (missing or empty).")
+            continue
+        header = read_header(path)
+        if not header:
+            print(f"Skipping {filename} (unreadable).")
+            continue
+        plan = plan_file(conn, filename, path, incremental)
+        stats[table] = {"mode": plan["mode"], "rows": 0, "inserted": 0, "ignored": 0, "quarantined": 0}
+        if plan["mode"] == "unchanged":
+            continue
+        plans[filename] = (table, plan)
+        for start, end in split_csv(path, chunk_bytes, plan["start"], plan["end"]):
+            tasks.append((str(path), start, end, header, table, insert_func))
+
+    # Round-robin the files so they are all parsed at the same time
+    by_table = {}
+    for task in tasks:
+        by_table.setdefault(task[4], []).append(task)
+    ordered = []
+    while any(by_table.values()):
+        for table_tasks in by_table.values():
+            if table_tasks:
+                ordered.append(table_tasks.pop(0))
+
+    start_time = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = []
+        pending = iter(ordered)
+        conn.execute("BEGIN")
+        try:
+            # A rewritten file replaces everything in its table
+            for filename, (table, plan) in plans.items():
+                if plan["mode"] == "reload":
+                    conn.execute(f"DELETE FROM {table}")
+                    conn.execute("DELETE FROM ingest_quarantine WHERE filename = ?", (filename,))
+
+            while True:
+                # Keep a bounded number of chunks parsed ahead of the writer
+                while len(in_flight) < max_in_flight:
+                    task = next(pending, None)
+                    if task is None:
+                        break
+                    path, start, end, header, table, insert_func = task
+                    in_flight.append((Path(path).name, table, insert_func,
+                                      pool.submit(parse_csv_range, path, start, end, header, table)))
+                if not in_flight:
+                    break
+
+                filename, table, insert_func, future = in_flight.pop(0)
+                df, quarantined = future.result()
+                inserted, ignored = insert_func(conn, df)
+                if quarantined:
+                    conn.executemany(
+                        "INSERT INTO ingest_quarantine (filename, table_name, row_data, reason) VALUES (?, ?, ?, ?)",
+                        [(filename, table, row_data, reason) for row_data, reason in quarantined]
+                    )
+                stats[table]["rows"] += len(df) + len(quarantined)
+                stats[table]["inserted"] += inserted
+                stats[table]["ignored"] += ignored
+                stats[table]["quarantined"] += len(quarantined)
+
+            # Watermarks commit together with the rows they describe
+            for filename, (table, plan) in plans.items():
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO ingest_watermarks
+                        (filename, table_name, byte_offset, row_count, content_hash, updated_at)
+                    VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                    """,
+                    (filename, table, plan["end"], plan["rows"] + stats[table]["rows"], plan["hash"])
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    seconds = time.perf_counter() - start_time
+    total_rows = sum(table_stats["rows"] for table_stats in stats.values())
+    print(f"✅ Parsed and loaded {total_rows} CSV rows in {len(ordered)} chunks "
+          f"({total_rows / seconds if seconds else 0:,.0f} rows/s, {workers} workers)")
+    return stats
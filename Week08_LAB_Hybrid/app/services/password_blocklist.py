@@ -0,0 +1,253 @@
+"""
+Offline breached-password check.
+
+A blocklist file holds the first 8 bytes of the SHA-1 of every breached
+password as a sorted array of big-endian uint64 values, preceded by a
+65536-entry fan-out table indexed by the top 16 bits. Lookups memory-map
+the file and binary-search one fan-out slot, so they take microseconds and
+only touch a few pages, whatever the list size.
+
+Build a blocklist from a password list (one password per line), or from a
+SHA-1 list such as the "HASH:count" dump from Have I Been Pwned:
+
+    python -m app.services.password_blocklist build passwords.txt DATA/breached_passwords.bin
+    python -m app.services.password_blocklist build pwned-sha1.txt DATA/breached_passwords.bin --sha1
+
+The build is an external sort. Hashes are spread over 256 bucket files by
+their top byte; a bucket holding more than MAX_BUCKET_KEYS keys is split
+again by the next byte, and so on, until every bucket fits. Each bucket is
+then sorted in memory and de-duplicated in one pass over the sorted keys.
+At most MAX_BUCKET_KEYS keys are sorted at once (about 40 MB as Python
+ints), however long the list is; a bigger list only costs more disk.
+"""
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+
+MAGIC = b"PWBLv1\0\0"
+FANOUT_BITS = 16
+FANOUT_SIZE = 1 << FANOUT_BITS
+# magic + record count + (FANOUT_SIZE + 1) record offsets
+HEADER_SIZE = 8 + 8 + 8 * (FANOUT_SIZE + 1)
+RECORD = struct.Struct(">Q")
+# Buckets are split 8 bits at a time, so 256 bucket files are open at most
+SPLIT_BITS = 8
+BUCKETS = 1 << SPLIT_BITS
+# The most keys sorted in memory at once; bigger buckets are split further
+MAX_BUCKET_KEYS = 1 << 20
+FLUSH_BYTES = 1 << 20
+
+
+def password_key(password):
+    """First 8 bytes of SHA-1(password) as an int."""
+    return RECORD.unpack_from(hashlib.sha1(password.encode('utf-8')).digest())[0]
+
+
+class PasswordBlocklist:
+    """Read-only view of a blocklist file built by build_blocklist()."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:8] != MAGIC:
+            raise ValueError(f"{path} is not a password blocklist file")
+        self.count = struct.unpack_from(">Q", self._map, 8)[0]
+        self._fanout_offset = 16
+
+    def __len__(self):
+        return self.count
+
+    def _fanout(self, prefix):
+        return struct.unpack_from(">Q", self._map, self._fanout_offset + 8 * prefix)[0]
+
+    def contains_key(self, key):
+        prefix = key >> (64 - FANOUT_BITS)
+        low = self._fanout(prefix)
+        high = self._fanout(prefix + 1)
+        while low < high:
+            mid = (low + high) // 2
+            value = RECORD.unpack_from(self._map, HEADER_SIZE + 8 * mid)[0]
+            if value < key:
+                low = mid + 1
+            elif value > key:
+                high = mid
+            else:
+                return True
+        return False
+
+    def __contains__(self, password):
+        return self.contains_key(password_key(password))
+
+    def close(self):
+        self._map.close()
+
+
+def _iter_keys(input_path, sha1_input):
+    with open(input_path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.rstrip("\r\n")
+            if not line:
+                continue
+            if sha1_input:
+                # "HASH" or "HASH:count"; only the first 16 hex digits are kept
+                try:
+                    yield int(line[:16], 16)
+                except ValueError:
+                    continue
+            else:
+                yield password_key(line)
+
+
+def _partition(keys, directory, shift):
+    """
+    Spread keys over BUCKETS files in `directory` by the SPLIT_BITS bits
+    at `shift`. Returns the file paths in key order.
+    """
+    paths = [os.path.join(directory, f"{i:02x}.bin") for i in range(BUCKETS)]
+    buffers = [bytearray() for _ in range(BUCKETS)]
+    files = [open(path, "wb") for path in paths]
+    try:
+        for key in keys:
+            bucket = (key >> shift) & (BUCKETS - 1)
+            buffers[bucket] += RECORD.pack(key)
+            if len(buffers[bucket]) >= FLUSH_BYTES:
+                files[bucket].write(buffers[bucket])
+                buffers[bucket].clear()
+        for bucket, data in enumerate(buffers):
+            files[bucket].write(data)
+    finally:
+        for f in files:
+            f.close()
+    return paths
+
+
+def _read_keys(path):
+    """Yield the keys in a bucket file, reading it a block at a time."""
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(FLUSH_BYTES)
+            if not block:
+                return
+            keys = array("Q")
+            keys.frombytes(block)
+            if sys.byteorder == "little":
+                keys.byteswap()
+            yield from keys
+
+
+def _write_bucket(path, shift, out, fanout):
+    """
+    Sort and de-duplicate the bucket file at `path` (split at `shift`)
+    into `out`, splitting it further first if it holds more than
+    MAX_BUCKET_KEYS keys. Deletes the file.
+
+    Returns:
+        int: number of distinct keys written
+    """
+    if os.path.getsize(path) > RECORD.size * MAX_BUCKET_KEYS:
+        if shift == 0:
+            # Split on every bit already: all keys in here are the same
+            keys = array("Q", [next(_read_keys(path))])
+        else:
+            directory = path + ".d"
+            os.mkdir(directory)
+            paths = _partition(_read_keys(path), directory, shift - SPLIT_BITS)
+            os.remove(path)
+            total = sum(_write_bucket(sub_path, shift - SPLIT_BITS, out, fanout) for sub_path in paths)
+            os.rmdir(directory)
+            return total
+    else:
+        keys = array("Q")
+        with open(path, "rb") as f:
+            keys.frombytes(f.read())
+        if sys.byteorder == "little":
+            keys.byteswap()
+    os.remove(path)
+
+    # Sorted, so duplicates sit next to each other
+    unique = array("Q")
+    previous = None
+    for key in sorted(keys):
+        if key != previous:
+            unique.append(key)
+            fanout[(key >> (64 - FANOUT_BITS)) + 1] += 1
+            previous = key
+    del keys
+
+    if sys.byteorder == "little":
+        unique.byteswap()
+    unique.tofile(out)
+    return len(unique)
+
+
+def build_blocklist(input_path, output_path, sha1_input=False):
+    """
+    Build a blocklist file from a password (or SHA-1) list. The file is
+    written next to `output_path` and moved into place when complete, so
+    a running app never maps a half-written blocklist.
+
+    Returns:
+        int: number of distinct entries written
+    """
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(output_path))) as tmp:
+        # Pass 1: spread 8-byte keys over bucket files by their top byte
+        bucket_paths = _partition(_iter_keys(input_path, sha1_input), tmp, 64 - SPLIT_BITS)
+
+        # Pass 2: sort and de-duplicate each bucket, writing them in order
+        fanout = array("Q", [0]) * (FANOUT_SIZE + 1)
+        total = 0
+        partial_path = os.path.join(tmp, "blocklist.bin")
+        with open(partial_path, "wb") as out:
+            out.write(b"\0" * HEADER_SIZE)
+            for path in bucket_paths:
+                total += _write_bucket(path, 64 - SPLIT_BITS, out, fanout)
+
+            # Turn per-prefix counts into start offsets
+            for prefix in range(FANOUT_SIZE):
+                fanout[prefix + 1] += fanout[prefix]
+
+            out.seek(0)
+            out.write(MAGIC)
+            out.write(struct.pack(">Q", total))
+            if sys.byteorder == "little":
+                fanout.byteswap()
+            fanout.tofile(out)
+        os.replace(partial_path, output_path)
+
+    return total
+
+
+# path -> (modification time, PasswordBlocklist)
+_blocklists = {}
+
+
+def is_breached_password(password, path):
+    """
+    True if `password` is in the blocklist at `path`.
+    Returns False when no blocklist has been built there. The file is
+    looked for on every call and reopened when it changes, so a blocklist
+    built or rebuilt while the app runs is used straight away.
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        _blocklists.pop(path, None)
+        return False
+    cached = _blocklists.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, PasswordBlocklist(path))
+        _blocklists[path] = cached
+    return password in cached[1]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 4 or sys.argv[1] != "build":
+        print("Usage: python -m app.services.password_blocklist build <input.txt> <output.bin> [--sha1]")
+        sys.exit(1)
+    count = build_blocklist(sys.argv[2], sys.argv[3], sha1_input="--sha1" in sys.argv[4:])
+    print(f"Wrote {count} breached password hashes to {sys.argv[3]}")
@@ -1,9 +1,77 @@
+import math
+import os
+import re
 import sqlite3
+import time
 import bcrypt
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
 from app.data.db import connect_database
+from app.data.write_queue import execute_write
+from app.services.password_blocklist import is_breached_password
+
+# bcrypt cost used for every new hash; call configure_bcrypt_rounds() to
+# derive it from a target verify latency instead of the library default
+BCRYPT_ROUNDS = 12
+BCRYPT_TARGET_MS = 150
+MIN_BCRYPT_ROUNDS = 10
+MAX_BCRYPT_ROUNDS = 16
+
+# Built with: python -m app.services.password_blocklist build <list.txt> DATA/breached_passwords.bin
+BREACHED_PASSWORDS_FILE = Path("DATA") / "breached_passwords.bin"
+
+# $2a$/$2b$/$2y$ + cost 04-31 + 22-char salt + 31-char hash. The salt's
+# last character only carries 2 bits, so it must be one of . O e u;
+# anything else makes bcrypt.checkpw raise "Invalid salt".
+BCRYPT_HASH_RE = re.compile(
+    r"^\$2[aby]\$(0[4-9]|[12]\d|3[01])\$[./A-Za-z0-9]{21}[.Oeu][./A-Za-z0-9]{31}$"
+)
+
+
+def calibrate_bcrypt_rounds(target_ms=BCRYPT_TARGET_MS, min_rounds=MIN_BCRYPT_ROUNDS,
+                            max_rounds=MAX_BCRYPT_ROUNDS):
+    """
+    Benchmark bcrypt on this machine and return the cost factor whose
+    verify time is closest to target_ms (each extra round doubles the work).
+    """
+    password = b"calibration-password"
+    salt = bcrypt.gensalt(rounds=min_rounds)
+
+    elapsed_ms = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        bcrypt.hashpw(password, salt)
+        elapsed_ms = min(elapsed_ms, (time.perf_counter() - start) * 1000)
+
+    extra_rounds = round(math.log2(target_ms / max(elapsed_ms, 0.001)))
+    return max(min_rounds, min(max_rounds, min_rounds + extra_rounds))
+
+
+def configure_bcrypt_rounds(target_ms=BCRYPT_TARGET_MS):
+    """Calibrate and use the result for all new hashes."""
+    global BCRYPT_ROUNDS
+    BCRYPT_ROUNDS = calibrate_bcrypt_rounds(target_ms)
+    return BCRYPT_ROUNDS
+
+
+def get_hash_rounds(password_hash):
+    """Return the cost factor stored in a bcrypt hash, or None if malformed."""
+    try:
+        return int(password_hash.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def hash_password(password):
+    hashed = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=BCRYPT_ROUNDS))
+    return hashed.decode("utf-8")
+
 
 def register_user(username, password, role="user"):
+    if is_breached_password(password, str(BREACHED_PASSWORDS_FILE)):
+        return False, "This password has appeared in a data breach, choose another."
+
     conn = connect_database()
     cursor = conn.cursor()
 
@@ -13,15 +81,13 @@ def register_user(username, password, role="user"):
         conn.close()
         return False, f"Username '{username}' already exists."
 
-    password_bytes = password.encode("utf-8")
-    hashed = bcrypt.hashpw(password_bytes, bcrypt.gensalt())
-    password_hash = hashed.decode("utf-8")
+    password_hash = hash_password(password)
 
-    cursor.execute(
+    execute_write(
+        conn,
         "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
         (username, password_hash, role)
     )
-    conn.commit()
     conn.close()
     return True, f"User '{username}' registered successfully!"
 
@@ -31,16 +97,25 @@ def login_user(username, password):
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
     user = cursor.fetchone()
-    conn.close()
 
     if not user:
+        conn.close()
         return False, "Username not found."
 
     stored_hash = user[2]
     password_bytes = password.encode('utf-8')
     hash_bytes = stored_hash.encode('utf-8')
     if bcrypt.checkpw(password_bytes, hash_bytes):
+        # Upgrade hashes made at an old cost while we have the plain password
+        if get_hash_rounds(stored_hash) != BCRYPT_ROUNDS:
+            execute_write(
+                conn,
+                "UPDATE users SET password_hash = ? WHERE id = ?",
+                (hash_password(password), user[0])
+            )
+        conn.close()
         return True, f"Login successful!"
+    conn.close()
     return False, "Incorrect password."
 
 
@@ -84,4 +159,122 @@ def migrate_users_from_file(conn, filepath="DATA/users.txt"):
 
     conn.commit()
     print(f"✅ Migrated {migrated_count} users from {filepath.name}")
-    return migrated_count
\ No newline at end of file
+    return migrated_count
+
+
+def validate_user_lines(numbered_lines):
+    """
+    Parse and validate a chunk of (line_no, line) pairs from users.txt.
+    Runs in a worker process, so it only uses plain data types.
+
+    Returns:
+        tuple: (rows, rejects) where rows are (username, password_hash, role)
+        and rejects are (line_no, reason)
+    """
+    rows = []
+    rejects = []
+    for line_no, line in numbered_lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        parts = line.split(',')
+        if len(parts) < 3:
+            rejects.append((line_no, "expected username,hash,role"))
+            continue
+        username = parts[0].strip()
+        password_hash = parts[1].strip()
+        role = parts[2].strip()
+        if not username:
+            rejects.append((line_no, "empty username"))
+        elif not BCRYPT_HASH_RE.match(password_hash):
+            rejects.append((line_no, "malformed bcrypt hash"))
+        else:
+            rows.append((username, password_hash, role))
+    return rows, rejects
+
+
+def bulk_migrate_users_from_file(conn, filepath="DATA/users.txt", chunk_size=10000, workers=None):
+    """
+    Bulk version of migrate_users_from_file for large user dumps.
+
+    The file is streamed in chunks of chunk_size lines. Chunks are parsed and
+    hash-checked in a process pool (a few chunks ahead of the writer) while
+    the main process inserts the valid rows with executemany, all inside a
+    single transaction. If the caller already has a transaction open the rows
+    join it and the caller decides whether to commit.
+
+    Args:
+        conn: Database connection
+        filepath: Path to users.txt file (can be string or Path object)
+        chunk_size: Lines per chunk
+        workers: Worker processes for validation (default: CPU count)
+
+    Returns:
+        dict: lines, inserted, duplicates, rejected, seconds, rows_per_sec and
+        the first few rejects as (line_no, reason)
+    """
+    filepath = Path(filepath)
+    stats = {"lines": 0, "inserted": 0, "duplicates": 0, "rejected": 0,
+             "seconds": 0.0, "rows_per_sec": 0.0, "reject_samples": []}
+    if not filepath.exists():
+        print(f"⚠️  File not found: {filepath}")
+        print("   No users to migrate.")
+        return stats
+
+    start = time.perf_counter()
+    cursor = conn.cursor()
+    changes_before = conn.total_changes
+
+    def insert_chunk(future):
+        rows, rejects = future.result()
+        cursor.executemany(
+            "INSERT OR IGNORE INTO users (username, password_hash, role) VALUES (?, ?, ?)",
+            rows
+        )
+        stats["rejected"] += len(rejects)
+        room = 20 - len(stats["reject_samples"])
+        stats["reject_samples"].extend(rejects[:room])
+        return len(rows)
+
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = 2 * workers
+    valid_rows = 0
+    with open(filepath, 'r') as f, ProcessPoolExecutor(max_workers=workers) as pool:
+        numbered = enumerate(f, start=1)
+        in_flight = []
+
+        own_transaction = not conn.in_transaction
+        if own_transaction:
+            cursor.execute("BEGIN")
+        try:
+            while True:
+                chunk = list(islice(numbered, chunk_size))
+                if chunk:
+                    stats["lines"] += len(chunk)
+                    in_flight.append(pool.submit(validate_user_lines, chunk))
+                # Keep a bounded number of chunks ahead so memory stays flat
+                while in_flight and (len(in_flight) >= max_in_flight or not chunk):
+                    valid_rows += insert_chunk(in_flight.pop(0))
+                if not chunk:
+                    break
+            if own_transaction:
+                conn.commit()
+        except Exception:
+            if own_transaction:
+                conn.rollback()
+            raise
+
+    stats["inserted"] = conn.total_changes - changes_before
+    stats["duplicates"] = valid_rows - stats["inserted"]
+    stats["seconds"] = time.perf_counter() - start
+    stats["rows_per_sec"] = stats["lines"] / stats["seconds"] if stats["seconds"] else 0.0
+
+    print(f"✅ Migrated {stats['inserted']} users from {filepath.name} "
+          f"({stats['duplicates']} duplicates, {stats['rejected']} rejected, "
+          f"{stats['rows_per_sec']:,.0f} lines/s)")
+    for line_no, reason in stats["reject_samples"]:
+        print(f"  ❌ Line {line_no}: {reason}")
+    if stats["rejected"]:
+        print(f"  ⚠️  {stats['rejected']} users with an invalid line or bcrypt hash were rejected, "
+              f"not migrated; fix them in {filepath.name} and run the setup again")
+    return stats
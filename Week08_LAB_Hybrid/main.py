@@ -1,88 +1,64 @@
 from pathlib import Path
 import os
+import sys
 import pandas as pd
-from app.data.db import connect_database
-from app.data.schema import create_all_tables
-from app.services.user_service import register_user, login_user, migrate_users_from_file
-from app.data.incidents import insert_incident_from_df, get_incidents_by_type_count, insert_incident, update_incident_status, get_high_severity_by_status, delete_incident, get_all_incidents
-from app.data.tickets import insert_ticket_from_df
-from app.data.datasets import insert_dataset_from_df
+from app.data.db import connect_database, describe_connection, publish_database
+from app.data.schema import create_all_tables, migrate_indexes
+from app.services.user_service import register_user, login_user, migrate_users_from_file, bulk_migrate_users_from_file, configure_bcrypt_rounds, BCRYPT_TARGET_MS
+from app.data.incidents import get_incidents_by_type_count, insert_incident, update_incident_status, get_high_severity_by_status, delete_incident, get_all_incidents
+from app.services.csv_ingest import ingest_csv_files
 
 DB_PATH = Path("DATA") / "intelligence_platform.db"
 CSV_DIR = Path("DATA")
-if DB_PATH.exists():
-    try:
-        os.remove(DB_PATH)
-        print("🗑️  Deleted old database")
-    except Exception as e:
-        print(f"⚠️  Could not delete database: {e}")
-        print("Please manually delete: data/intelligence_platform.db")
-        exit(1)
 
 
-def load_all_csv_data(conn):
+def load_all_csv_data(conn, incremental=False):
     total_rows_inserted = 0
-    csv_table_mapping = {
-        "cyber_incidents.csv": ("cyber_incidents", insert_incident_from_df),
-        "it_tickets.csv": ("it_tickets", insert_ticket_from_df),
-        "datasets_metadata.csv": ("datasets_metadata", insert_dataset_from_df),
-    }
+    # Chunks are parsed in parallel; this process is the only writer
+    stats = ingest_csv_files(conn, CSV_DIR, incremental=incremental)
+    for table, table_stats in stats.items():
+        total_rows_inserted += table_stats["inserted"]
+        if table_stats["mode"] == "unchanged":
+            print(f"✔ {table} is up to date")
+            continue
+        print(f"✔ Loaded {table_stats['inserted']} rows into {table} ({table_stats['ignored']} duplicates ignored, {table_stats['mode']})")
+        if table_stats["quarantined"]:
+            print(f"⚠️  {table_stats['quarantined']} {table} rows with unparseable dates moved to ingest_quarantine")
 
-    for filename, (table, insert_func) in csv_table_mapping.items():
-        path = CSV_DIR / filename
+    return total_rows_inserted
 
-        if not path.exists() or path.stat().st_size == 0:
-            print(f"Skipping {filename} (missing or empty).")
-            continue
 
-        try:
-            df = pd.read_csv(path)
-        except pd.errors.EmptyDataError:
-            print(f"Skipping {filename} (unreadable).")
-            continue
+def refresh_database_incremental():
+    """
+    Bring an existing database up to date without rebuilding it: only CSV
+    rows appended since the last run are loaded, and a table whose CSV was
+    rewritten is reloaded on its own (see app/services/csv_ingest.py).
+    """
+    print("\n" + "="*60)
+    print("INCREMENTAL DATABASE REFRESH")
+    print("="*60)
 
-        rename_rules = {
-            "cyber_incidents": {
-                "type": "incident_type",
-                "severity_level": "severity",
-                "reportedBy": "reported_by"
-            },
-            "it_tickets": {
-                "ticketID": "ticket_id",
-                "Ticket ID": "ticket_id",
-                "priorityLevel": "priority",
-                "assignedTo": "assigned_to",
-                "createdDate": "created_date",
-                "resolvedDate": "resolved_date"
-            },
-            "datasets_metadata": {
-                "datasetName": "dataset_name",
-                "fileSize": "file_size_mb",
-                "recordCount": "record_count",
-                "lastUpdated": "last_updated"
-            }
-        }
-
-        if table in rename_rules:
-            df.rename(
-                columns={old: new for old, new in rename_rules[table].items() if old in df.columns},
-                inplace=True,
-            )
-        rows_inserted = insert_func(conn, df)
-        total_rows_inserted += rows_inserted
-        print(f"✔ Loaded {rows_inserted} rows into {table}")
+    conn = connect_database(profile="bulk_ingest")
+    create_all_tables(conn)
 
-    return total_rows_inserted
+    print("\nMigrating new users from users.txt...")
+    user_count = bulk_migrate_users_from_file(conn)["inserted"]
+    print(f"       ✔ Migrated {user_count} users")
+
+    print("\nLoading new CSV rows...")
+    total_rows = load_all_csv_data(conn, incremental=True)
+    print(f"       ✔ Loaded {total_rows} new rows from CSV files")
+    conn.close()
 
 
-def setup_database_complete():
+def setup_database_complete(db_path=DB_PATH):
     """
     Complete database setup:
     1. Connect to database
     2. Create all tables
     3. Migrate users from users.txt
     4. Load CSV data for all domains
-    5. Verify setup
+    5. Verify setup (raises RuntimeError if it fails)
     """
     print("\n" + "="*60)
     print("STARTING COMPLETE DATABASE SETUP")
@@ -90,22 +66,26 @@ def setup_database_complete():
 
     # Step 1: Connect
     print("\n[1/5] Connecting to database...")
-    conn = connect_database()
+    # Bulk profile: no fsync per commit while the CSVs and users are loaded
+    conn = connect_database(db_path, profile="bulk_ingest")
     print("       ✔ Connected")
+    print(f"       Settings: {describe_connection(conn)}")
 
     # Step 2: Create tables
     print("\n[2/5] Creating database tables...")
-    create_all_tables(conn)
+    # Indexes are built once the data is in (step 4), not row by row
+    create_all_tables(conn, migrate=False)
 
     # Step 3: Migrate users
     print("\n[3/5] Migrating users from users.txt...")
-    user_count = migrate_users_from_file(conn)
+    user_count = bulk_migrate_users_from_file(conn)["inserted"]
     print(f"       ✔ Migrated {user_count} users")
 
     # Step 4: Load CSV data
     print("\n[4/5] Loading CSV data...")
     total_rows = load_all_csv_data(conn)
     print(f"       ✔ Loaded {total_rows} total rows from CSV files")
+    print(f"       ✔ Indexes at schema version {migrate_indexes(conn)}")
 
     # Step 5: Verify
     print("\n[5/5] Verifying database setup...")
@@ -117,17 +97,49 @@ def setup_database_complete():
     print(f"{'Table':<25} {'Row Count':<15}")
     print("-" * 40)
 
+    counted_rows = 0
     for table in tables:
         cursor.execute(f"SELECT COUNT(*) FROM {table}")
         count = cursor.fetchone()[0]
+        counted_rows += count
         print(f"{table:<25} {count:<15}")
 
+    integrity = cursor.execute("PRAGMA quick_check").fetchone()[0]
     conn.close()
+    if integrity != "ok":
+        raise RuntimeError(f"Database integrity check failed: {integrity}")
+    if counted_rows != user_count + total_rows:
+        raise RuntimeError(
+            f"Row count mismatch: loaded {user_count + total_rows} rows but found {counted_rows}"
+        )
 
     print("\n" + "="*60)
     print("✅ DATABASE SETUP COMPLETE!")
     print("="*60)
-    print(f"\n📍 Database location: {DB_PATH.resolve()}")
+    print(f"\n📍 Database location: {Path(db_path).resolve()}")
+
+
+def rebuild_database_atomic():
+    """
+    Rebuild the database without taking the live one away: everything is
+    built and verified in a shadow file next to it, and only then published
+    over DB_PATH (see publish_database). If any step fails the live
+    database is left as it was.
+    """
+    shadow_path = DB_PATH.with_name(DB_PATH.name + ".building")
+    for leftover in (shadow_path, Path(f"{shadow_path}-wal"), Path(f"{shadow_path}-shm")):
+        if leftover.exists():
+            os.remove(leftover)
+
+    try:
+        setup_database_complete(shadow_path)
+    except Exception:
+        if shadow_path.exists():
+            os.remove(shadow_path)
+        raise
+
+    publish_database(shadow_path, DB_PATH)
+    print(f"\n🔁 Published new database to {DB_PATH.resolve()}")
     print("\n🚀 You're ready for Week 9 (Streamlit web interface)!")
 
 
@@ -236,7 +248,15 @@ def main():
 
 
 if __name__ == "__main__":
-    # Run the complete setup
-    setup_database_complete()
-    # Run tests
-    run_comprehensive_tests()
\ No newline at end of file
+    # Pick the bcrypt cost for this machine before any hashing happens
+    rounds = configure_bcrypt_rounds()
+    print(f"bcrypt cost set to {rounds} (target {BCRYPT_TARGET_MS} ms per check)")
+
+    if "--incremental" in sys.argv[1:]:
+        # python main.py --incremental  -> only load what changed
+        refresh_database_incremental()
+    else:
+        # Run the complete setup (built aside, then swapped in)
+        rebuild_database_atomic()
+        # Run tests
+        run_comprehensive_tests()
\ No newline at end of file
@@ -1,9 +1,12 @@
 import streamlit as st
 import bcrypt
 from app.data.db import connect_database
-from app.data.users import verify_user, get_user_role, insert_user, get_user_by_username
+from app.data.users import authenticate_user, create_user, enable_credential_cache
 
 st.set_page_config(page_title="Login")
+# Optional: skip bcrypt for repeat logins within CREDENTIAL_CACHE_TTL seconds
+if st.secrets.get("CREDENTIAL_CACHE_TTL"):
+    enable_credential_cache(ttl=st.secrets["CREDENTIAL_CACHE_TTL"])
 def get_conn():
     return connect_database()
 conn = get_conn()
@@ -29,10 +32,11 @@ with tab1:
     password = st.text_input("Password", type="password", key="login_pass")
 
     if st.button("Login"):
-        if verify_user(username, password):
+        user = authenticate_user(username, password, conn)
+        if user:
             st.session_state.logged_in = True
             st.session_state.username = username
-            st.session_state.role = get_user_role(username)
+            st.session_state.role = user["role"]
             st.success("Login successful!")
             st.rerun()
         else:
@@ -49,9 +53,9 @@ with tab2:
             st.warning("Fill all fields")
         elif new_pass != confirm_pass:
             st.error("Passwords do not match")
-        elif get_user_by_username(new_user):
-            st.error("Username exists")
         else:
-            hashed_pw = bcrypt.hashpw(new_pass.encode(), bcrypt.gensalt())
-            insert_user(new_user, hashed_pw)
-            st.success("Account created! Go to Login tab")
\ No newline at end of file
+            hashed_pw = bcrypt.hashpw(new_pass.encode(), bcrypt.gensalt()).decode()
+            if create_user(new_user, hashed_pw, conn=conn):
+                st.success("Account created! Go to Login tab")
+            else:
+                st.error("Username exists")
\ No newline at end of file
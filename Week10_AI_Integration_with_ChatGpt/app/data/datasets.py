@@ -1,15 +1,18 @@
 import pandas as pd
+from app.data.bulk_insert import DEFAULT_CHUNK_SIZE, bulk_insert_df
+from app.data.write_queue import execute_write
+from app.data.pagination import PAGEABLE_COLUMNS, DEFAULT_PAGE_SIZE, fetch_page
+from app.data.timestamps import to_epoch
 
 def insert_dataset(conn, dataset_name, category=None, source=None, last_updated=None, record_count=None, file_size_mb=None):
     try:
-        cursor = conn.cursor()
         query = """
             INSERT INTO datasets_metadata
             (dataset_name, category, source, last_updated, record_count, file_size_mb)
             VALUES (?, ?, ?, ?, ?, ?)
         """
 
-        cursor.execute(query, (
+        cursor = execute_write(conn, query, (
             dataset_name,
             category,
             source,
@@ -18,7 +21,6 @@ def insert_dataset(conn, dataset_name, category=None, source=None, last_updated=
             file_size_mb
         ))
 
-        conn.commit()
         return cursor.lastrowid
     except Exception as e:
         print(f"Error inserting dataset: {e}")
@@ -33,14 +35,26 @@ def get_all_datasets(conn):
         return pd.DataFrame()
 
 
+def get_datasets_page(conn, cursor=None, page_size=DEFAULT_PAGE_SIZE, filters=None, order_by="id"):
+    """
+    One page of datasets, newest first, as (DataFrame, next_cursor).
+    Pass next_cursor back in to get the following page; it is None on the
+    last page. filters maps column -> value or list of values.
+    """
+    rows, next_cursor = fetch_page(
+        conn, "datasets_metadata", filters=filters, cursor=cursor,
+        page_size=page_size, order_by=order_by
+    )
+    return pd.DataFrame(rows, columns=PAGEABLE_COLUMNS["datasets_metadata"]), next_cursor
+
+
 def update_dataset_count(conn, dataset_id, new_count):
     try:
-        cursor = conn.cursor()
-        cursor.execute(
+        cursor = execute_write(
+            conn,
             "UPDATE datasets_metadata SET record_count = ? WHERE id = ?",
             (new_count, dataset_id)
         )
-        conn.commit()
         return cursor.rowcount
     except Exception as e:
         print(f"Error updating dataset: {e}")
@@ -49,12 +63,11 @@ def update_dataset_count(conn, dataset_id, new_count):
 
 def delete_dataset(conn, dataset_id):
     try:
-        cursor = conn.cursor()
-        cursor.execute(
+        cursor = execute_write(
+            conn,
             "DELETE FROM datasets_metadata WHERE id = ?",
             (dataset_id,)
         )
-        conn.commit()
         return cursor.rowcount
     except Exception as e:
         print(f"Error deleting dataset: {e}")
@@ -63,9 +76,8 @@ def delete_dataset(conn, dataset_id):
 
 def get_dataset_count_by_category(conn):
     query = """
-    SELECT category, COUNT(*) as count
-    FROM datasets_metadata
-    GROUP BY category
+    SELECT category, count
+    FROM dataset_category_counts
     ORDER BY count DESC
     """
     return pd.read_sql_query(query, conn)
@@ -81,27 +93,37 @@ def get_large_datasets(conn, min_size=100):
     return pd.read_sql_query(query, conn, params=(min_size,))
 
 
-def insert_dataset_from_df(conn, df):
-    cursor = conn.cursor()
-    count = 0
+def get_datasets_updated_between(conn, start, end):
+    """
+    Datasets last updated between start and end, oldest first.
+    start/end may be datetimes, dates, ISO strings or Unix seconds (see
+    timestamps.py); the range is start inclusive, end exclusive.
+    """
+    query = """
+    SELECT * FROM datasets_metadata
+    WHERE last_updated_ts >= ? AND last_updated_ts < ?
+    ORDER BY last_updated_ts
+    """
+    return pd.read_sql_query(query, conn, params=(to_epoch(start), to_epoch(end)))
+
+
+DATASETS_METADATA_COLUMNS = (
+    "dataset_name",
+    "category",
+    "source",
+    "last_updated",
+    "record_count",
+    "file_size_mb",
+)
+DATASETS_METADATA_REQUIRED = ("dataset_name",)
 
-    for _, row in df.iterrows():
-        cursor.execute(
-            """
-            INSERT OR IGNORE INTO datasets_metadata
-            (dataset_name, category, source, last_updated, record_count, file_size_mb)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            (
-                row["dataset_name"],
-                row.get("category", None),
-                row.get("source", None),
-                row.get("last_updated", None),
-                row.get("record_count", None),
-                row.get("file_size_mb", None)
-            )
-        )
-        count += 1
 
-    conn.commit()
-    return count
\ No newline at end of file
+def insert_dataset_from_df(conn, df, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Bulk-load a DataFrame into datasets_metadata (see bulk_insert_df).
+    Returns (inserted, ignored) row counts.
+    """
+    return bulk_insert_df(
+        conn, "datasets_metadata", DATASETS_METADATA_COLUMNS, df,
+        required=DATASETS_METADATA_REQUIRED, chunk_size=chunk_size
+    )
\ No newline at end of file
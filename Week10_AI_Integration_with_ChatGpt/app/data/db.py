@@ -1,8 +1,131 @@
+import os
 import sqlite3
+import sys
+import threading
 from pathlib import Path
 DB_PATH = Path("DATA") / "intelligence_platform.db"
 
-def connect_database(db_path=DB_PATH):
-    return sqlite3.connect(str(db_path))
+# Named connection profiles. All of them use WAL so readers never wait on
+# the writer; they differ in how hard each commit is pushed to disk and how
+# much memory the connection may use.
+#   dashboard    read-heavy pages: big page cache and memory-mapped reads
+#   bulk_ingest  one-off CSV / user loads: no fsync, largest cache
+#   safe_oltp    everyday writes (logins, CRUD): fsync on every commit
+CONNECTION_PROFILES = {
+    "dashboard": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -65536,        # KiB, i.e. 64 MB
+        "mmap_size": 268435456,      # 256 MB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,        # ms
+    },
+    "bulk_ingest": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -262144,       # 256 MB
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+        "busy_timeout": 30000,
+    },
+    "safe_oltp": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16384,        # 16 MB
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 5000,
+    },
+}
 
+# The profile used when none is passed; set DB_PROFILE to change it
+DEFAULT_PROFILE = "safe_oltp"
 
+SYNCHRONOUS_NAMES = {0: "OFF", 1: "NORMAL", 2: "FULL", 3: "EXTRA"}
+TEMP_STORE_NAMES = {0: "DEFAULT", 1: "FILE", 2: "MEMORY"}
+
+
+def get_profile_name(profile=None):
+    name = profile or os.environ.get("DB_PROFILE") or DEFAULT_PROFILE
+    if name not in CONNECTION_PROFILES:
+        raise ValueError(
+            f"Unknown database profile '{name}'. Choose one of: {', '.join(CONNECTION_PROFILES)}"
+        )
+    return name
+
+
+def apply_profile(conn, profile=None):
+    settings = CONNECTION_PROFILES[get_profile_name(profile)]
+    # busy_timeout first so the journal_mode switch can wait for other writers
+    conn.execute(f"PRAGMA busy_timeout = {int(settings['busy_timeout'])}")
+    conn.execute(f"PRAGMA journal_mode = {settings['journal_mode']}")
+    conn.execute(f"PRAGMA synchronous = {settings['synchronous']}")
+    conn.execute(f"PRAGMA cache_size = {int(settings['cache_size'])}")
+    conn.execute(f"PRAGMA mmap_size = {int(settings['mmap_size'])}")
+    conn.execute(f"PRAGMA temp_store = {settings['temp_store']}")
+    return conn
+
+
+# Database files whose schema migrations ran in this process
+_migrated_paths = set()
+_migrate_lock = threading.Lock()
+
+# The tables the schema migrations build on
+MIGRATED_TABLES = ("cyber_incidents", "datasets_metadata", "it_tickets")
+
+
+def ensure_schema(conn, db_path):
+    """
+    Apply pending schema migrations (INDEX_MIGRATIONS in schema.py) the
+    first time a database file is opened in this process, so the indexes,
+    summary tables, search indexes and epoch columns the queries rely on
+    exist. A file without the base tables yet is left alone;
+    create_all_tables() migrates it once it has created them.
+    """
+    key = os.path.abspath(str(db_path))
+    with _migrate_lock:
+        if key in _migrated_paths:
+            return
+        placeholders = ", ".join("?" * len(MIGRATED_TABLES))
+        found = conn.execute(
+            f"SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN ({placeholders})",
+            MIGRATED_TABLES
+        ).fetchone()[0]
+        if found < len(MIGRATED_TABLES):
+            return
+        # Imported here because schema.py imports this module
+        from app.data.schema import migrate_indexes
+        migrate_indexes(conn)
+        _migrated_paths.add(key)
+
+
+def connect_database(db_path=DB_PATH, profile=None):
+    conn = apply_profile(sqlite3.connect(str(db_path)), profile)
+    if str(db_path) != ":memory:":
+        ensure_schema(conn, db_path)
+    return conn
+
+
+def describe_connection(conn):
+    """Return the settings actually in effect on `conn`."""
+    def pragma(name):
+        return conn.execute(f"PRAGMA {name}").fetchone()[0]
+
+    return {
+        "journal_mode": pragma("journal_mode").upper(),
+        "synchronous": SYNCHRONOUS_NAMES.get(pragma("synchronous")),
+        "cache_size": pragma("cache_size"),
+        "mmap_size": pragma("mmap_size"),
+        "temp_store": TEMP_STORE_NAMES.get(pragma("temp_store")),
+        "busy_timeout": pragma("busy_timeout"),
+    }
+
+
+if __name__ == "__main__":
+    # python -m app.data.db [profile]  -> print the settings a connection gets
+    profile = get_profile_name(sys.argv[1] if len(sys.argv) > 1 else None)
+    conn = connect_database(profile=profile)
+    print(f"Profile: {profile}")
+    for key, value in describe_connection(conn).items():
+        print(f"  {key:13} {value}")
+    conn.close()
@@ -1,8 +1,12 @@
 import pandas as pd
+from app.data.bulk_insert import DEFAULT_CHUNK_SIZE, bulk_insert_df
+from app.data.write_queue import execute_write
+from app.data.pagination import PAGEABLE_COLUMNS, DEFAULT_PAGE_SIZE, fetch_page
+from app.data.search import DEFAULT_SEARCH_LIMIT, search
 
+from app.data.timestamps import to_epoch
 def insert_incident(conn, date, incident_type, severity, status, description, reported_by=None):
     try:
-        cursor = conn.cursor()
         query = """
             INSERT INTO cyber_incidents
                 (date, incident_type, severity, status, description, reported_by)
@@ -10,8 +14,7 @@ def insert_incident(conn, date, incident_type, severity, status, description, re
                 (?, ?, ?, ?, ?, ?)
         """
 
-        cursor.execute(query, (date, incident_type, severity, status, description, reported_by))
-        conn.commit()
+        cursor = execute_write(conn, query, (date, incident_type, severity, status, description, reported_by))
         return cursor.lastrowid
 
     except Exception as e:
@@ -27,14 +30,36 @@ def get_all_incidents(conn):
         return pd.DataFrame()
 
 
+def get_incidents_page(conn, cursor=None, page_size=DEFAULT_PAGE_SIZE, filters=None, order_by="id"):
+    """
+    One page of incidents, newest first, as (DataFrame, next_cursor).
+    Pass next_cursor back in to get the following page; it is None on the
+    last page. filters maps column -> value or list of values.
+    """
+    rows, next_cursor = fetch_page(
+        conn, "cyber_incidents", filters=filters, cursor=cursor,
+        page_size=page_size, order_by=order_by
+    )
+    return pd.DataFrame(rows, columns=PAGEABLE_COLUMNS["cyber_incidents"]), next_cursor
+
+
+def search_incidents(conn, text, limit=DEFAULT_SEARCH_LIMIT, filters=None):
+    """
+    Incidents whose description matches `text`, best match first, as a
+    DataFrame with a BM25 score (lower is better) and a highlighted
+    snippet. The last word matches as a prefix (see search.py).
+    """
+    rows = search(conn, "cyber_incidents", text, filters=filters, limit=limit)
+    return pd.DataFrame(rows, columns=[*PAGEABLE_COLUMNS["cyber_incidents"], "score", "snippet"])
+
+
 def update_incident_status(conn, incident_id, new_status):
     try:
-        cursor = conn.cursor()
-        cursor.execute(
+        cursor = execute_write(
+            conn,
             "UPDATE cyber_incidents SET status = ? WHERE id = ?",
             (new_status, incident_id)
         )
-        conn.commit()
         return cursor.rowcount
     except Exception as e:
         print(f"Error updating incident: {e}")
@@ -43,12 +68,11 @@ def update_incident_status(conn, incident_id, new_status):
 
 def delete_incident(conn, incident_id):
     try:
-        cursor = conn.cursor()
-        cursor.execute(
+        cursor = execute_write(
+            conn,
             "DELETE FROM cyber_incidents WHERE id = ?",
             (incident_id,)
         )
-        conn.commit()
         return cursor.rowcount
     except Exception as e:
         print(f"Error deleting incident: {e}")
@@ -58,12 +82,11 @@ def delete_incident(conn, incident_id):
 def get_incidents_by_type_count(conn):
     """
     Count incidents by type.
-    Uses: SELECT, FROM, GROUP BY, ORDER BY
+    Reads the trigger-maintained incident_type_counts (see summaries.py)
     """
     query = """
-    SELECT incident_type, COUNT(*) as count
-    FROM cyber_incidents
-    GROUP BY incident_type
+    SELECT incident_type, count
+    FROM incident_type_counts
     ORDER BY count DESC
     """
     return pd.read_sql_query(query, conn)
@@ -71,46 +94,71 @@ def get_incidents_by_type_count(conn):
 
 def get_high_severity_by_status(conn):
     query = """
-    SELECT status, COUNT(*) as count
-    FROM cyber_incidents
+    SELECT status, count
+    FROM incident_severity_status_counts
     WHERE severity = 'High'
-    GROUP BY status
     ORDER BY count DESC
     """
     return pd.read_sql_query(query, conn)
 
-def get_incident_types_with_many_cases(conn, min_count=5):
+def get_incident_counts_by_type_between(conn, start, end):
+    """
+    Incidents dated between start and end, counted by type.
+    start/end may be datetimes, dates, ISO strings or Unix seconds (see
+    timestamps.py); the range is start inclusive, end exclusive.
+    Runs as a range scan of the (date_ts, incident_type) index.
+    """
     query = """
     SELECT incident_type, COUNT(*) as count
     FROM cyber_incidents
+    WHERE date_ts >= ? AND date_ts < ?
     GROUP BY incident_type
-    HAVING COUNT(*) > ?
+    ORDER BY count DESC
+    """
+    return pd.read_sql_query(query, conn, params=(to_epoch(start), to_epoch(end)))
+
+
+def get_incidents_between(conn, start, end):
+    """
+    Incidents dated between start and end, oldest first.
+    start/end may be datetimes, dates, ISO strings or Unix seconds (see
+    timestamps.py); the range is start inclusive, end exclusive.
+    """
+    query = """
+    SELECT * FROM cyber_incidents
+    WHERE date_ts >= ? AND date_ts < ?
+    ORDER BY date_ts
+    """
+    return pd.read_sql_query(query, conn, params=(to_epoch(start), to_epoch(end)))
+
+
+def get_incident_types_with_many_cases(conn, min_count=5):
+    query = """
+    SELECT incident_type, count
+    FROM incident_type_counts
+    WHERE count > ?
     ORDER BY count DESC
     """
     return pd.read_sql_query(query, conn, params=(min_count,))
 
 
-def insert_incident_from_df(conn, df):
-    cursor = conn.cursor()
-    count = 0
-
-    for _, row in df.iterrows():
-        cursor.execute(
-            """
-            INSERT OR IGNORE INTO cyber_incidents
-            (date, incident_type, severity, status, description, reported_by)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            (
-                row["date"],
-                row["incident_type"],
-                row["severity"],
-                row["status"],
-                row["description"],
-                row.get("reported_by", None)
-            )
-        )
-        count += 1
+CYBER_INCIDENTS_COLUMNS = (
+    "date",
+    "incident_type",
+    "severity",
+    "status",
+    "description",
+    "reported_by",
+)
+CYBER_INCIDENTS_REQUIRED = ("date", "incident_type", "severity", "status", "description")
 
-    conn.commit()
-    return count
+
+def insert_incident_from_df(conn, df, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Bulk-load a DataFrame into cyber_incidents (see bulk_insert_df).
+    Returns (inserted, ignored) row counts.
+    """
+    return bulk_insert_df(
+        conn, "cyber_incidents", CYBER_INCIDENTS_COLUMNS, df,
+        required=CYBER_INCIDENTS_REQUIRED, chunk_size=chunk_size
+    )
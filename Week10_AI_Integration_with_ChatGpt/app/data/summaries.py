@@ -0,0 +1,140 @@
+"""
+Summary tables behind the dashboard counters.
+
+Each summary table holds one row per group of a base table with the number
+of base rows in that group, so the count queries read a handful of rows
+instead of re-aggregating the whole table. Triggers on the base table keep
+the counts exact on every INSERT, UPDATE and DELETE, in the same
+transaction as the change itself.
+
+The tables and triggers are created by schema migration 3 (see
+INDEX_MIGRATIONS in schema.py). To check them, or rebuild them from the
+base tables:
+
+    python -m app.data.summaries            # verify, exit code 1 on a mismatch
+    python -m app.data.summaries --rebuild  # recompute, then verify
+"""
+import sys
+from app.data.db import DB_PATH, connect_database
+
+# summary table -> (base table, grouped columns)
+SUMMARY_TABLES = {
+    "incident_type_counts": ("cyber_incidents", ("incident_type",)),
+    "incident_severity_status_counts": ("cyber_incidents", ("severity", "status")),
+    "ticket_status_counts": ("it_tickets", ("status",)),
+    "ticket_assignee_counts": ("it_tickets", ("assigned_to",)),
+    "dataset_category_counts": ("datasets_metadata", ("category",)),
+}
+
+
+def _matches(columns, row):
+    # IS rather than = so a NULL group (e.g. unassigned tickets) is a group too
+    return " AND ".join(f"{column} IS {row}.{column}" for column in columns)
+
+
+def _add(summary, columns, row, delta):
+    """Statements adding `delta` to the group of NEW/OLD, creating or dropping it."""
+    statements = []
+    if delta > 0:
+        statements.append(
+            f"INSERT INTO {summary} ({', '.join(columns)}, count) "
+            f"SELECT {', '.join(f'{row}.{column}' for column in columns)}, 0 "
+            f"WHERE NOT EXISTS (SELECT 1 FROM {summary} WHERE {_matches(columns, row)});"
+        )
+    statements.append(f"UPDATE {summary} SET count = count + {delta} WHERE {_matches(columns, row)};")
+    if delta < 0:
+        statements.append(f"DELETE FROM {summary} WHERE {_matches(columns, row)} AND count <= 0;")
+    return statements
+
+
+def summary_statements():
+    """
+    CREATE TABLE / CREATE TRIGGER statements for every summary table, then
+    the statements filling them from the current base tables.
+    """
+    statements = []
+    for summary, (table, columns) in SUMMARY_TABLES.items():
+        statements.append(
+            f"CREATE TABLE IF NOT EXISTS {summary} ("
+            f"{', '.join(f'{column} TEXT' for column in columns)}, "
+            f"count INTEGER NOT NULL, PRIMARY KEY ({', '.join(columns)}))"
+        )
+        insert_body = " ".join(_add(summary, columns, "NEW", 1))
+        delete_body = " ".join(_add(summary, columns, "OLD", -1))
+        changed = " OR ".join(f"OLD.{column} IS NOT NEW.{column}" for column in columns)
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS trg_{summary}_insert AFTER INSERT ON {table} "
+            f"BEGIN {insert_body} END",
+            f"CREATE TRIGGER IF NOT EXISTS trg_{summary}_delete AFTER DELETE ON {table} "
+            f"BEGIN {delete_body} END",
+            f"CREATE TRIGGER IF NOT EXISTS trg_{summary}_update AFTER UPDATE OF {', '.join(columns)} ON {table} "
+            f"WHEN {changed} BEGIN {delete_body} {insert_body} END",
+        ]
+    for summary in SUMMARY_TABLES:
+        statements += refill_statements(summary)
+    return statements
+
+
+def _group_query(summary):
+    table, columns = SUMMARY_TABLES[summary]
+    return f"SELECT {', '.join(columns)}, COUNT(*) FROM {table} GROUP BY {', '.join(columns)}"
+
+
+def refill_statements(summary):
+    """Statements recomputing one summary table from its base table."""
+    columns = SUMMARY_TABLES[summary][1]
+    return [
+        f"DELETE FROM {summary}",
+        f"INSERT INTO {summary} ({', '.join(columns)}, count) {_group_query(summary)}",
+    ]
+
+
+def verify_summaries(conn):
+    """
+    Recompute every summary from its base table and compare.
+
+    Returns:
+        dict: summary table -> list of (group, expected count, stored count)
+        for every group that differs; empty lists mean all is exact
+    """
+    differences = {}
+    for summary, (table, columns) in SUMMARY_TABLES.items():
+        expected = {tuple(row[:-1]): row[-1] for row in conn.execute(_group_query(summary))}
+        stored = {
+            tuple(row[:-1]): row[-1]
+            for row in conn.execute(f"SELECT {', '.join(columns)}, count FROM {summary}")
+        }
+        differences[summary] = [
+            (group, expected.get(group, 0), stored.get(group, 0))
+            for group in sorted(expected.keys() | stored.keys(), key=repr)
+            if expected.get(group, 0) != stored.get(group, 0)
+        ]
+    return differences
+
+
+def rebuild_summaries(conn):
+    """Recompute every summary table from scratch in one transaction."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for summary in SUMMARY_TABLES:
+            for sql in refill_statements(summary):
+                conn.execute(sql)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+if __name__ == "__main__":
+    conn = connect_database(DB_PATH)
+    if "--rebuild" in sys.argv[1:]:
+        rebuild_summaries(conn)
+        print("✔ Summary tables rebuilt")
+    mismatches = 0
+    for summary, differences in verify_summaries(conn).items():
+        mismatches += len(differences)
+        print(f"{'❌' if differences else '✅'} {summary}")
+        for group, expected, stored in differences:
+            print(f"     {group}: expected {expected}, stored {stored}")
+    conn.close()
+    sys.exit(1 if mismatches else 0)
@@ -0,0 +1,82 @@
+"""
+Integer epoch columns for the free-form date columns.
+
+Every date column gets a companion INTEGER column holding the same moment
+as Unix seconds (UTC; dates without a time are midnight). The companions
+are generated columns computed by SQLite from the text column, so every
+INSERT and UPDATE keeps them in sync without triggers, and each one is
+indexed so time ranges are index range scans. A date SQLite can't read
+gives NULL, never a wrong number.
+
+Stored text should still be real ISO 8601 dates; check values from
+outside with is_valid_date() before writing them.
+
+The columns and indexes are created by schema migration 5 (see
+INDEX_MIGRATIONS in schema.py).
+"""
+import re
+from datetime import date, datetime, timezone
+
+# table -> {text column: epoch column}
+EPOCH_COLUMNS = {
+    "cyber_incidents": {"date": "date_ts"},
+    "it_tickets": {"created_date": "created_ts", "resolved_date": "resolved_ts"},
+    "datasets_metadata": {"last_updated": "last_updated_ts"},
+}
+
+# What SQLite's date functions read: a date, optionally a time, optionally
+# a UTC offset
+ISO_DATE_RE = re.compile(
+    r"^\d{4}-\d{2}-\d{2}(?:[ T]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:\d{2})?)?$"
+)
+
+
+def is_valid_date(text):
+    """True if `text` is an ISO 8601 date (and time) that exists in the calendar."""
+    if not ISO_DATE_RE.match(text):
+        return False
+    try:
+        datetime.fromisoformat(text)
+    except ValueError:
+        # e.g. 2024-02-30, which SQLite would quietly roll over to March
+        return False
+    return True
+
+
+def to_epoch(value):
+    """
+    Unix seconds for an int/float (returned as is), a datetime or date, or
+    an ISO 8601 string. Naive values are taken as UTC.
+    """
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        if not is_valid_date(value.strip()):
+            raise ValueError(f"Not an ISO 8601 date: {value!r}")
+        value = datetime.fromisoformat(value.strip())
+    elif isinstance(value, date) and not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    if not isinstance(value, datetime):
+        raise TypeError(f"Can't turn {type(value).__name__} into a timestamp")
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def epoch_statements():
+    """ALTER TABLE / CREATE INDEX statements adding the epoch columns."""
+    statements = []
+    for table, columns in EPOCH_COLUMNS.items():
+        for text_column, epoch_column in columns.items():
+            statements.append(
+                f"ALTER TABLE {table} ADD COLUMN {epoch_column} INTEGER "
+                f"GENERATED ALWAYS AS (CAST(strftime('%s', {text_column}) AS INTEGER)) VIRTUAL"
+            )
+    statements += [
+        # Incidents between two times, counted by type: covering range scan
+        "CREATE INDEX IF NOT EXISTS idx_cyber_incidents_date_ts_type ON cyber_incidents(date_ts, incident_type)",
+        "CREATE INDEX IF NOT EXISTS idx_it_tickets_created_ts ON it_tickets(created_ts)",
+        "CREATE INDEX IF NOT EXISTS idx_it_tickets_resolved_ts ON it_tickets(resolved_ts)",
+        "CREATE INDEX IF NOT EXISTS idx_datasets_metadata_last_updated_ts ON datasets_metadata(last_updated_ts)",
+    ]
+    return statements
@@ -1,5 +1,21 @@
-from app.data.db import connect_database
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from collections import OrderedDict
 import bcrypt
+from app.data.db import connect_database
+from app.data.write_queue import execute_write
+
+# Opt-in cache of recent successful verify_user() calls (see
+# enable_credential_cache). Keys are usernames; values are
+# (HMAC of username + password, password_hash, expiry).
+credential_cache = OrderedDict()
+credential_cache_lock = threading.Lock()
+CREDENTIAL_CACHE_TTL = 0  # seconds; 0 = disabled
+CREDENTIAL_CACHE_MAX = 1024
+CREDENTIAL_CACHE_KEY = secrets.token_bytes(32)
 
 def get_user_by_username(username):
     """Retrieve user by username."""
@@ -16,14 +32,49 @@ def get_user_by_username(username):
 def insert_user(username, password_hash, role='user'):
     """Insert new user. Expects password_hash (already bcrypt hashed)."""
     conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute(
+    execute_write(
+        conn,
         "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
         (username, password_hash, role)
     )
-    conn.commit()
     conn.close()
 
+def enable_credential_cache(ttl=60, max_entries=1024):
+    """Let verify_user skip bcrypt for repeat logins within ttl seconds."""
+    global CREDENTIAL_CACHE_TTL, CREDENTIAL_CACHE_MAX
+    CREDENTIAL_CACHE_TTL = ttl
+    CREDENTIAL_CACHE_MAX = max_entries
+
+
+def credential_digest(username, plain_password):
+    message = username.encode() + b"\0" + plain_password.encode()
+    return hmac.new(CREDENTIAL_CACHE_KEY, message, hashlib.sha256).digest()
+
+
+def check_credential_cache(username, plain_password, stored_hash):
+    """True if this login was verified against stored_hash within the TTL."""
+    with credential_cache_lock:
+        entry = credential_cache.get(username)
+        if entry is None:
+            return False
+        digest, cached_hash, expires_at = entry
+        # A changed password_hash invalidates the entry
+        if expires_at < time.monotonic() or cached_hash != stored_hash:
+            del credential_cache[username]
+            return False
+    return hmac.compare_digest(digest, credential_digest(username, plain_password))
+
+
+def remember_credentials(username, plain_password, stored_hash):
+    entry = (credential_digest(username, plain_password), stored_hash,
+             time.monotonic() + CREDENTIAL_CACHE_TTL)
+    with credential_cache_lock:
+        credential_cache[username] = entry
+        credential_cache.move_to_end(username)
+        while len(credential_cache) > CREDENTIAL_CACHE_MAX:
+            credential_cache.popitem(last=False)
+
+
 def verify_user(username, plain_password):
     """Verify username + bcrypt hashed password."""
     conn = connect_database()
@@ -38,11 +89,81 @@ def verify_user(username, plain_password):
 
     stored_hash = result["password_hash"] if isinstance(result, dict) else result[0]
 
+    return check_password(username, plain_password, stored_hash)
+
+
+def check_password(username, plain_password, stored_hash):
+    """bcrypt check of a stored hash, going through the credential cache if enabled."""
     # Ensure stored_hash is bytes
     if isinstance(stored_hash, str):
         stored_hash = stored_hash.encode()
 
-    return bcrypt.checkpw(plain_password.encode(), stored_hash)
+    if CREDENTIAL_CACHE_TTL and check_credential_cache(username, plain_password, stored_hash):
+        return True
+
+    verified = bcrypt.checkpw(plain_password.encode(), stored_hash)
+    if verified and CREDENTIAL_CACHE_TTL:
+        remember_credentials(username, plain_password, stored_hash)
+    return verified
+
+
+def get_user_credentials(username, conn=None):
+    """
+    Fetch (id, password_hash, role) for a user in a single query.
+    Uses `conn` if given (e.g. the page's connection) instead of opening one.
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_database()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT id, password_hash, role FROM users WHERE username = ?",
+            (username,)
+        )
+        return cursor.fetchone()
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def authenticate_user(username, plain_password, conn=None):
+    """
+    Verify a login and return {"id", "username", "role"}, or None.
+    Replaces verify_user + get_user_role with one DB round trip.
+    """
+    row = get_user_credentials(username, conn)
+    if row is None:
+        return None
+
+    user_id, stored_hash, role = row
+    if not check_password(username, plain_password, stored_hash):
+        return None
+    return {"id": user_id, "username": username, "role": role}
+
+
+def create_user(username, password_hash, role='user', conn=None):
+    """
+    Insert a new user unless the username is taken.
+    Relies on the UNIQUE constraint instead of a separate SELECT, so two
+    registrations for the same name can't both succeed.
+
+    Returns:
+        bool: True if the user was created, False if the username exists
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_database()
+    try:
+        cursor = execute_write(
+            conn,
+            "INSERT OR IGNORE INTO users (username, password_hash, role) VALUES (?, ?, ?)",
+            (username, password_hash, role)
+        )
+        return cursor.rowcount == 1
+    finally:
+        if own_conn:
+            conn.close()
 
 def get_user_role(username):
     """Retrieve the role of a user."""
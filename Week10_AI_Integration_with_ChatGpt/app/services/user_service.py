@@ -2,6 +2,7 @@ import sqlite3
 import bcrypt
 from pathlib import Path
 from app.data.db import connect_database
+from app.data.write_queue import execute_write
 
 def register_user(username, password, role="user"):
     conn = connect_database()
@@ -17,11 +18,11 @@ def register_user(username, password, role="user"):
     hashed = bcrypt.hashpw(password_bytes, bcrypt.gensalt())
     password_hash = hashed.decode("utf-8")
 
-    cursor.execute(
+    execute_write(
+        conn,
         "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
         (username, password_hash, role)
     )
-    conn.commit()
     conn.close()
     return True, f"User '{username}' registered successfully!"
 
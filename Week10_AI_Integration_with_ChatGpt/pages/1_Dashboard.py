@@ -7,7 +7,8 @@ from app.data.tickets import get_all_tickets
 
 st.set_page_config(page_title="Dashboard", layout="wide")
 def get_conn():
-    return connect_database()
+    # Read-heavy page; DB_PROFILE in secrets.toml overrides
+    return connect_database(profile=st.secrets.get("DB_PROFILE", "dashboard"))
 
 conn = get_conn()
 
@@ -8,7 +8,8 @@ client = OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
 
 
 def get_conn():
-    return connect_database()
+    # Read-heavy page; DB_PROFILE in secrets.toml overrides
+    return connect_database(profile=st.secrets.get("DB_PROFILE", "dashboard"))
 conn = get_conn()
 
 if not st.session_state.get("logged_in", False):
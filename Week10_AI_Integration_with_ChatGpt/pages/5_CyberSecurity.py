@@ -6,7 +6,8 @@ from app.data.incidents import get_all_incidents
 st.set_page_config(page_title="Cybersecurity", layout="wide")
 
 def get_conn():
-    return connect_database()
+    # Read-heavy page; DB_PROFILE in secrets.toml overrides
+    return connect_database(profile=st.secrets.get("DB_PROFILE", "dashboard"))
 conn = get_conn()
 
 if not st.session_state.get("logged_in", False):
@@ -1,19 +1,41 @@
 import streamlit as st
 from services.database_manager import DatabaseManager
-from services.auth_manager import AuthManager
+from services.auth_manager import AuthManager, SimpleHasher, DEFAULT_BCRYPT_ROUNDS, get_calibrated_rounds
+from services.hash_worker_pool import ServerBusyError, get_shared_hasher
+from services.session_manager import get_session_manager
+from services.credential_cache import get_credential_cache
 from models.user import User
 
 st.set_page_config(page_title="Login")
 
-if "logged_in" not in st.session_state:
-    st.session_state.logged_in = False
+# Session tokens are checked against the shared store on every page; set
+# SESSION_DB in secrets.toml to share them between worker processes
+sessions = get_session_manager(st.secrets.get("SESSION_DB"))
 
-db = DatabaseManager("database/intelligence_platform.db")
-db.connect()
-auth = AuthManager(db)
+db = DatabaseManager(
+    "database/intelligence_platform.db",
+    profile=st.secrets.get("DB_PROFILE", "dashboard"),
+    # Optional: wait this many ms for more writes before each shared commit
+    group_commit_ms=st.secrets.get("GROUP_COMMIT_MS"),
+    # Optional: reuse read results until a write touches their tables
+    cache_results=st.secrets.get("QUERY_CACHE", False),
+)
+# bcrypt cost: calibrated to BCRYPT_TARGET_MS if set in secrets.toml
+target_ms = st.secrets.get("BCRYPT_TARGET_MS")
+rounds = get_calibrated_rounds(target_ms) if target_ms else DEFAULT_BCRYPT_ROUNDS
+
+# Optional: verify passwords in a shared process pool (USE_HASH_POOL in secrets.toml)
+if st.secrets.get("USE_HASH_POOL", False):
+    hasher = get_shared_hasher(rounds=rounds)
+else:
+    hasher = SimpleHasher(rounds=rounds)
+# Optional: skip bcrypt for repeat logins within CREDENTIAL_CACHE_TTL seconds
+cache_ttl = st.secrets.get("CREDENTIAL_CACHE_TTL")
+credential_cache = get_credential_cache(ttl=cache_ttl) if cache_ttl else None
+auth = AuthManager(db, hasher=hasher, credential_cache=credential_cache)
 
 current_user: User | None = st.session_state.get("current_user")
-if st.session_state.logged_in and current_user is not None:
+if current_user is not None and sessions.validate_session(st.session_state.get("session_token")):
     st.success(
         f"Logged in as {current_user.get_username()} ({current_user.get_role()})"
     )
@@ -29,11 +51,15 @@ with tab1:
     password = st.text_input("Password", type="password", key="login_pass")
 
     if st.button("Login"):
-        user: User | None = auth.login_user(username, password)
+        try:
+            user: User | None = auth.login_user(username, password)
+        except ServerBusyError as e:
+            st.warning(str(e))
+            st.stop()
         if user is None:
             st.error("Invalid username or password")
         else:
-            st.session_state.logged_in = True
+            st.session_state.session_token = sessions.create_session(user.get_username(), user.get_role())
             st.session_state.current_user = user
             st.session_state.current_role = user.get_role()
             st.success("Login successful!")
@@ -58,7 +84,8 @@ with tab2:
                 st.error(f"Error creating account: {str(e)}")
 
 if st.sidebar.button("Logout"):
-    st.session_state.logged_in = False
+    sessions.end_session(st.session_state.get("session_token"))
+    st.session_state.session_token = None
     st.session_state.current_user = None
     st.session_state.current_role = None
     st.rerun()
\ No newline at end of file
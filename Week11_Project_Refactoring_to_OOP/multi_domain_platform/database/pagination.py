@@ -0,0 +1,124 @@
+import base64
+import json
+
+# Keyset ("seek") pagination: each page starts right after the last row of
+# the previous one (WHERE (key, id) < (last_key, last_id)), so fetching page
+# 1000 costs the same as page 1 instead of scanning past OFFSET rows.
+#
+# Only these tables and columns may be used; they end up in the SQL text.
+PAGEABLE_COLUMNS = {
+    "cyber_incidents": (
+        "id", "date", "incident_type", "severity", "status",
+        "description", "reported_by", "created_at",
+    ),
+    "it_tickets": (
+        "id", "ticket_id", "priority", "status", "category", "subject",
+        "description", "created_date", "resolved_date", "assigned_to", "created_at",
+    ),
+    "datasets_metadata": (
+        "id", "dataset_name", "category", "source", "last_updated",
+        "record_count", "file_size_mb", "created_at",
+    ),
+}
+SORT_KEYS = ("id", "created_at")
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(sort_key, row_key, row_id):
+    """Opaque cursor pointing just past the row (row_key, row_id)."""
+    raw = json.dumps([sort_key, row_key, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor, sort_key):
+    try:
+        cursor_key, row_key, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid page cursor")
+    if cursor_key != sort_key:
+        raise ValueError(f"Page cursor was made for ordering by '{cursor_key}', not '{sort_key}'")
+    return row_key, row_id
+
+
+def _check_column(table, column):
+    if column not in PAGEABLE_COLUMNS[table]:
+        raise ValueError(f"Unknown column '{column}' for {table}")
+
+
+def build_page_query(table, columns=None, filters=None, cursor=None,
+                     page_size=DEFAULT_PAGE_SIZE, order_by="id", descending=True):
+    """
+    Build the SQL and parameters for one page of `table`.
+
+    filters maps column -> value (equality) or column -> list/tuple of
+    values (IN). The query asks for page_size + 1 rows; the extra row only
+    tells the caller whether another page exists (see split_page).
+    The last two selected columns are always the sort key and id.
+    """
+    if table not in PAGEABLE_COLUMNS:
+        raise ValueError(f"Table '{table}' does not support paging")
+    if order_by not in SORT_KEYS:
+        raise ValueError(f"Can only page by one of: {', '.join(SORT_KEYS)}")
+    columns = list(columns or PAGEABLE_COLUMNS[table])
+    for column in columns:
+        _check_column(table, column)
+    page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+
+    where = []
+    params = []
+    for column, value in (filters or {}).items():
+        _check_column(table, column)
+        if isinstance(value, (list, tuple, set)):
+            values = list(value)
+            if not values:
+                where.append("0")
+                continue
+            where.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        else:
+            where.append(f"{column} = ?")
+            params.append(value)
+
+    op = "<" if descending else ">"
+    direction = "DESC" if descending else "ASC"
+    if cursor:
+        row_key, row_id = decode_cursor(cursor, order_by)
+        if order_by == "id":
+            where.append(f"id {op} ?")
+            params.append(row_id)
+        else:
+            where.append(f"({order_by}, id) {op} (?, ?)")
+            params.extend([row_key, row_id])
+
+    order = f"id {direction}" if order_by == "id" else f"{order_by} {direction}, id {direction}"
+    sql = f"SELECT {', '.join(columns)}, {order_by}, id FROM {table}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += f" ORDER BY {order} LIMIT ?"
+    params.append(page_size + 1)
+    return sql, params, page_size
+
+
+def split_page(rows, page_size, order_by="id"):
+    """
+    Turn the rows of a build_page_query() query into (rows, next_cursor).
+    The trailing sort key and id columns are stripped from each row;
+    next_cursor is None on the last page.
+    """
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor(order_by, last[-2], last[-1])
+    return [tuple(row[:-2]) for row in rows], next_cursor
+
+
+def fetch_page(conn, table, columns=None, filters=None, cursor=None,
+               page_size=DEFAULT_PAGE_SIZE, order_by="id", descending=True):
+    """Run one page query on `conn` and return (rows, next_cursor)."""
+    sql, params, page_size = build_page_query(
+        table, columns, filters, cursor, page_size, order_by, descending
+    )
+    return split_page(conn.execute(sql, params).fetchall(), page_size, order_by)
@@ -1,3 +1,43 @@
+import re
+import sys
+from database.db import DB_PATH, connect_database
+from database.pagination import build_page_query, encode_cursor
+from database.search import build_search_query, search_statements
+
+# Secondary indexes, one step per schema version, matched to the queries the
+# pages run. Each step is applied once, in order, and recorded in PRAGMA
+# user_version (see migrate_indexes). Never change a step that has shipped;
+# add a new version instead.
+INDEX_MIGRATIONS = [
+    (1, "page by created_at", [
+        # Keyset pages newest-first by created_at without sorting the table
+        "CREATE INDEX IF NOT EXISTS idx_cyber_incidents_created_at ON cyber_incidents(created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_datasets_metadata_created_at ON datasets_metadata(created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_it_tickets_created_at ON it_tickets(created_at, id)",
+    ]),
+    (2, "filter and group-by indexes", [
+        # GROUP BY incident_type (counts, HAVING): covering, no table reads
+        "CREATE INDEX IF NOT EXISTS idx_cyber_incidents_type ON cyber_incidents(incident_type)",
+        # WHERE severity = ? GROUP BY status: covering
+        "CREATE INDEX IF NOT EXISTS idx_cyber_incidents_severity_status ON cyber_incidents(severity, status)",
+        # WHERE status = ? (page filters, open counts)
+        "CREATE INDEX IF NOT EXISTS idx_cyber_incidents_status ON cyber_incidents(status)",
+        # GROUP BY status / WHERE status = ?
+        "CREATE INDEX IF NOT EXISTS idx_it_tickets_status ON it_tickets(status)",
+        # WHERE priority = ? ORDER BY created_at: no sort step
+        "CREATE INDEX IF NOT EXISTS idx_it_tickets_priority_created_at ON it_tickets(priority, created_at)",
+        # GROUP BY assigned_to: covering
+        "CREATE INDEX IF NOT EXISTS idx_it_tickets_assigned_to ON it_tickets(assigned_to)",
+        # GROUP BY category: covering
+        "CREATE INDEX IF NOT EXISTS idx_datasets_metadata_category ON datasets_metadata(category)",
+        # WHERE file_size_mb > ? ORDER BY file_size_mb: range scan, no sort step
+        "CREATE INDEX IF NOT EXISTS idx_datasets_metadata_file_size ON datasets_metadata(file_size_mb)",
+    ]),
+    # FTS5 indexes over incident and ticket text (see search.py)
+    (3, "full-text search", search_statements()),
+]
+SCHEMA_VERSION = INDEX_MIGRATIONS[-1][0]
+
 def create_users_table(conn):
     cursor = conn.cursor()
     create_sqlTable1 = """
@@ -76,14 +116,147 @@ def create_it_tickets_table(conn):
     conn.commit()
     print("✔ it_tickets table created successfully.")
 
-def create_all_tables(conn):
+def get_schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate_indexes(conn):
+    """
+    Apply every INDEX_MIGRATIONS step newer than the database's
+    user_version. Each step runs in its own short write transaction that
+    also bumps user_version, so readers carry on meanwhile (WAL) and a
+    step interrupted halfway is simply run again next time. Safe to call
+    on every start-up, from several processes at once.
+
+    Returns:
+        int: the schema version after migrating
+    """
+    for version, description, statements in INDEX_MIGRATIONS:
+        if version <= get_schema_version(conn):
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have applied it while we waited for the lock
+            if get_schema_version(conn) >= version:
+                conn.rollback()
+                continue
+            for sql in statements:
+                conn.execute(sql)
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        print(f"✔ Schema migration {version} applied ({description}).")
+    # Refresh planner statistics for the new indexes
+    conn.execute("PRAGMA optimize")
+    return get_schema_version(conn)
+
+
+def create_all_tables(conn, migrate=True):
+    """
+    Create every table, then (unless migrate=False) bring the indexes up
+    to date. Bulk loads pass migrate=False and call migrate_indexes()
+    afterwards, since building an index once is cheaper than keeping it
+    up to date row by row.
+    """
     create_users_table(conn)
     create_cyber_incidents_table(conn)
     create_datasets_metadata_table(conn)
     create_it_tickets_table(conn)
     print("✅ Users table created successfully!")
+    if migrate:
+        migrate_indexes(conn)
 
 
+def shipped_queries():
+    """
+    (name, sql, params, whole_table) for every query the pages and
+    services send; keep it in step with them. Paged queries start from a
+    cursor so they show the plan used for every page after the first (the
+    first page walks the same index from its end, under the LIMIT).
+    whole_table marks listings that read every row by design, where a
+    full scan is expected rather than a missing index.
+    """
+    by_id = encode_cursor("id", None, 2 ** 62)
+    incident_columns = ("id", "date", "incident_type", "severity", "status", "description")
+    ticket_columns = ("id", "subject", "priority", "status", "assigned_to")
+    dataset_columns = ("id", "dataset_name", "file_size_mb", "record_count", "source")
+
+    def page(table, columns, filters=None):
+        return build_page_query(table, columns, filters, by_id)[:2]
+
+    return [
+        ("login: user by name",
+         "SELECT username, password_hash, role FROM users WHERE username = ?", ("alice",), False),
+        ("Dashboard: newest incidents",
+         *page("cyber_incidents", ("id", "incident_type", "severity", "status", "description")), False),
+        ("Dashboard: newest datasets", *page("datasets_metadata", dataset_columns), False),
+        ("Dashboard: newest tickets", *page("it_tickets", ticket_columns), False),
+        ("Dashboard: total incidents", "SELECT COUNT(*) FROM cyber_incidents", (), False),
+        ("Dashboard: total datasets", "SELECT COUNT(*) FROM datasets_metadata", (), False),
+        ("Dashboard: open tickets", "SELECT COUNT(*) FROM it_tickets WHERE status = 'Open'", (), False),
+        ("Incidents: page (status, severity)",
+         *page("cyber_incidents", incident_columns, {"status": ["Open"], "severity": ["High", "Critical"]}),
+         False),
+        ("Incidents: search",
+         *build_search_query("cyber_incidents", "phish", incident_columns, {"status": ["Open"]}), False),
+        ("Incidents: threats detected",
+         "SELECT COUNT(*) FROM cyber_incidents WHERE status = 'Open'", (), False),
+        ("Incidents: vulnerabilities",
+         "SELECT COUNT(*) FROM cyber_incidents WHERE severity IN ('High', 'Critical')", (), False),
+        ("Incidents: threat distribution",
+         "SELECT incident_type, COUNT(*) FROM cyber_incidents GROUP BY incident_type ORDER BY COUNT(*) DESC",
+         (), False),
+        ("IT Operations: search", *build_search_query("it_tickets", "vpn", ticket_columns, limit=50), False),
+        ("IT Operations: all tickets",
+         "SELECT id, subject, priority, status, assigned_to FROM it_tickets", (), True),
+        ("Data Science: all datasets",
+         "SELECT id, dataset_name, file_size_mb, record_count, source FROM datasets_metadata", (), True),
+        ("CyberSecurity: all incidents",
+         "SELECT id, incident_type, severity, status, description FROM cyber_incidents ORDER BY id DESC",
+         (), True),
+    ]
+
 
+# A plan step that reads a table without any index: "SCAN <table>" with no
+# "USING ..." (covering index scans and rowid searches are fine)
+FULL_SCAN_RE = re.compile(r"^SCAN (\w+)$")
+
+
+def check_query_plans(conn):
+    """
+    Look at the EXPLAIN QUERY PLAN of each shipped query.
+
+    Returns:
+        list: (name, plan steps, full scans, whole_table) per query; a
+        query is fine when its full scans list is empty or whole_table
+        is set
+    """
+    results = []
+    for name, sql, params, whole_table in shipped_queries():
+        steps = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+        full_scans = [step for step in steps if FULL_SCAN_RE.match(step)]
+        results.append((name, steps, full_scans, whole_table))
+    return results
 
 
+if __name__ == "__main__":
+    # python -m database.schema          create tables and apply index migrations
+    # python -m database.schema --check  confirm every shipped query uses an index
+    conn = connect_database(DB_PATH)
+    # The app migrates on first use (DatabaseManager), so check what it will run on
+    create_all_tables(conn)
+    print(f"Schema version {get_schema_version(conn)} (latest {SCHEMA_VERSION})")
+    if "--check" in sys.argv[1:]:
+        failures = 0
+        for name, steps, full_scans, whole_table in check_query_plans(conn):
+            failed = bool(full_scans) and not whole_table
+            failures += failed
+            mark = "❌" if failed else "⚠️ " if full_scans else "✅"
+            print(f"{mark} {name}{'  (reads every row by design)' if full_scans and whole_table else ''}")
+            for step in steps:
+                print(f"     {step}")
+        conn.close()
+        sys.exit(1 if failures else 0)
+    conn.close()
@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
 from services.database_manager import DatabaseManager
+from services.session_manager import get_session_manager
 from services.auth_manager import AuthManager
 from models.security_incident import SecurityIncident
 from models.dataset import Dataset
@@ -8,56 +9,68 @@ from models.it_ticket import ITTicket
 
 st.set_page_config(page_title="Dashboard", layout="wide")
 
-db = DatabaseManager('database/intelligence_platform.db')
-db.connect()
+db = DatabaseManager(
+    "database/intelligence_platform.db",
+    profile=st.secrets.get("DB_PROFILE", "dashboard"),
+    group_commit_ms=st.secrets.get("GROUP_COMMIT_MS"),
+    cache_results=st.secrets.get("QUERY_CACHE", False),
+)
 auth = AuthManager(db)
 
+sessions = get_session_manager(st.secrets.get("SESSION_DB"))
 current_user = st.session_state.get("current_user")
-if current_user is None:
+if current_user is None or sessions.validate_session(st.session_state.get("session_token")) is None:
     st.error("You must log in first.")
     if st.button("Go to Login"):
         st.switch_page("Home.py")
     st.stop()
 
 if st.sidebar.button("Logout"):
+    sessions.end_session(st.session_state.get("session_token"))
+    st.session_state.session_token = None
     st.session_state.current_user = None
     st.session_state.current_role = None
     st.switch_page("Home.py")
 st.title("Main Dashboard")
 
-incident_rows = db.fetch_all(
-    "SELECT id, incident_type, severity, status, description FROM cyber_incidents"
-)
-incidents: list[SecurityIncident] = []
-for row in incident_rows:
-    inc = SecurityIncident(
+# Quick views show the newest rows only; each row is turned into a model and
+# a table record as it is read
+QUICK_VIEW_ROWS = 20
+
+
+def incident_record(row):
+    i = SecurityIncident(
         incident_id=row[0],
         incident_type=row[1],
         severity=row[2],
         status=row[3],
         description=row[4],
     )
-    incidents.append(inc)
+    return {
+        "Type": i.get_incident_type(),
+        "Severity": i.get_severity(),
+        "Status": i.get_status(),
+        "Description": i.get_description()
+    }
 
-dataset_rows = db.fetch_all(
-    "SELECT id, dataset_name, file_size_mb, record_count, source FROM datasets_metadata"
-)
-datasets: list[Dataset] = []
-for row in dataset_rows:
-    ds = Dataset(
+
+def dataset_record(row):
+    d = Dataset(
         dataset_id=row[0],
         name=row[1],
         size_bytes=int(row[2] * 1024 * 1024) if row[2] else 0,
         rows=row[3],
         source=row[4],
     )
-    datasets.append(ds)
+    return {
+        "Name": d.get_name(),
+        "Size (MB)": d.calculate_size_mb(),
+        "Rows": d.get_rows(),
+        "Source": d.get_source()
+    }
 
-ticket_rows = db.fetch_all(
-    "SELECT id, subject, priority, status, assigned_to FROM it_tickets"
-)
-tickets: list[ITTicket] = []
-for row in ticket_rows:
+
+def ticket_record(row):
     t = ITTicket(
         ticket_id=row[0],
         title=row[1],
@@ -65,41 +78,46 @@ for row in ticket_rows:
         status=row[3],
         assigned_to=row[4],
     )
-    tickets.append(t)
-
-df_incidents = pd.DataFrame([{
-    "Type": i.get_incident_type(),
-    "Severity": i.get_severity(),
-    "Status": i.get_status(),
-    "Description": i.get_description()
-} for i in incidents]) if incidents else pd.DataFrame()
-
-df_datasets = pd.DataFrame([{
-    "Name": d.get_name(),
-    "Size (MB)": d.calculate_size_mb(),
-    "Rows": d.get_rows(),
-    "Source": d.get_source()
-} for d in datasets]) if datasets else pd.DataFrame()
-
-df_tickets = pd.DataFrame([{
-    "ID": t.get_id(),
-    "Title": t.get_title(),
-    "Priority": t.get_priority(),
-    "Status": t.get_status(),
-    "Assigned To": t.get_assigned_to() or "Unassigned"
-} for t in tickets]) if tickets else pd.DataFrame()
+    return {
+        "ID": t.get_id(),
+        "Title": t.get_title(),
+        "Priority": t.get_priority(),
+        "Status": t.get_status(),
+        "Assigned To": t.get_assigned_to() or "Unassigned"
+    }
+
+
+incident_records, _ = db.fetch_page(
+    "cyber_incidents", ("id", "incident_type", "severity", "status", "description"),
+    page_size=QUICK_VIEW_ROWS, mapper=incident_record
+)
+df_incidents = pd.DataFrame(incident_records)
 
+dataset_records, _ = db.fetch_page(
+    "datasets_metadata", ("id", "dataset_name", "file_size_mb", "record_count", "source"),
+    page_size=QUICK_VIEW_ROWS, mapper=dataset_record
+)
+df_datasets = pd.DataFrame(dataset_records)
 
-col1, col2, col3 = st.columns(3)
-col1.metric("Total Incidents", len(df_incidents))
-col2.metric("Datasets Available", len(df_datasets))
-col3.metric(
-    "Open Tickets",
-    len(df_tickets[df_tickets["Status"] == "Open"]) if not df_tickets.empty else 0
+ticket_records, _ = db.fetch_page(
+    "it_tickets", ("id", "subject", "priority", "status", "assigned_to"),
+    page_size=QUICK_VIEW_ROWS, mapper=ticket_record
 )
+df_tickets = pd.DataFrame(ticket_records)
+
+total_incidents = db.fetch_one("SELECT COUNT(*) FROM cyber_incidents")[0]
+total_datasets = db.fetch_one("SELECT COUNT(*) FROM datasets_metadata")[0]
+open_tickets = db.fetch_one("SELECT COUNT(*) FROM it_tickets WHERE status = 'Open'")[0]
+
+
+col1, col2, col3 = st.columns(3)
+col1.metric("Total Incidents", total_incidents)
+col2.metric("Datasets Available", total_datasets)
+col3.metric("Open Tickets", open_tickets)
 
 st.divider()
 st.subheader("Quick View")
+st.caption(f"Newest {QUICK_VIEW_ROWS} of each")
 
 st.write("### Security Incidents")
 if not df_incidents.empty:
@@ -117,4 +135,22 @@ st.write("### IT Tickets")
 if not df_tickets.empty:
     st.dataframe(df_tickets, use_container_width=True)
 else:
-    st.info("No tickets found")
\ No newline at end of file
+    st.info("No tickets found")
+
+with st.expander("Database writer"):
+    # Every session hands its writes to one shared writer thread
+    write_stats = db.write_stats()
+    w1, w2, w3 = st.columns(3)
+    w1.metric("Queued writes", write_stats.get("queue_depth", 0))
+    w2.metric("Avg write latency (ms)", write_stats.get("avg_latency_ms", 0.0))
+    w3.metric("Avg batch size", write_stats.get("avg_batch_size", 0.0))
+    st.json(write_stats)
+
+with st.expander("Query cache"):
+    # Enabled with QUERY_CACHE = true in secrets.toml
+    cache_stats = db.cache_stats()
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Cache hits", cache_stats["hits"])
+    c2.metric("Cache misses", cache_stats["misses"])
+    c3.metric("Hit rate", f"{cache_stats['hit_rate']:.0%}")
+    st.json(cache_stats)
@@ -1,5 +1,6 @@
 import streamlit as st
 from services.database_manager import DatabaseManager
+from services.session_manager import get_session_manager
 from services.auth_manager import AuthManager
 from services.ai_assistant import AIAssistant
 from models.security_incident import SecurityIncident
@@ -8,8 +9,12 @@ from datetime import datetime
 
 st.set_page_config(page_title="Cybersecurity Incidents", layout="wide")
 
-db = DatabaseManager("database/intelligence_platform.db")
-db.connect()
+db = DatabaseManager(
+    "database/intelligence_platform.db",
+    profile=st.secrets.get("DB_PROFILE", "dashboard"),
+    group_commit_ms=st.secrets.get("GROUP_COMMIT_MS"),
+    cache_results=st.secrets.get("QUERY_CACHE", False),
+)
 auth = AuthManager(db)
 
 api_key = st.secrets.get("OPENAI_API_KEY")
@@ -19,14 +24,17 @@ if not api_key:
 
 ai = AIAssistant(api_key=api_key, system_prompt="You are a cybersecurity expert.")
 
+sessions = get_session_manager(st.secrets.get("SESSION_DB"))
 current_user = st.session_state.get("current_user")
-if current_user is None:
+if current_user is None or sessions.validate_session(st.session_state.get("session_token")) is None:
     st.error("You must log in first.")
     if st.button("Go to Login"):
         st.switch_page("Home.py")
     st.stop()
 
 if st.sidebar.button("Logout"):
+    sessions.end_session(st.session_state.get("session_token"))
+    st.session_state.session_token = None
     st.session_state.current_user = None
     st.session_state.current_role = None
     st.switch_page("Home.py")
@@ -34,41 +42,61 @@ if st.sidebar.button("Logout"):
 st.title("Cybersecurity Incidents")
 st.subheader("Monitor and analyze security incidents")
 
-def fetch_all_incidents():
-    """Fetch all incidents and convert to SecurityIncident objects."""
-    rows = db.fetch_all(
-        "SELECT id, date, incident_type, severity, status, description, reported_by FROM cyber_incidents ORDER BY id DESC"
-    )
-
-    incidents: list[SecurityIncident] = []
-    for row in rows:
-        inc = SecurityIncident(
-            incident_id=row[0],
-            incident_type=row[2],
-            severity=row[3],
-            status=row[4],
-            description=row[5],
-        )
-        incidents.append(inc)
+INCIDENT_PAGE_SIZE = 50
+INCIDENT_COLUMNS = ("id", "date", "incident_type", "severity", "status", "description")
 
-    return incidents, rows
 
+def to_incident(row):
+    """Convert an incident row to a SecurityIncident object."""
+    return SecurityIncident(
+        incident_id=row[0],
+        incident_type=row[2],
+        severity=row[3],
+        status=row[4],
+        description=row[5],
+    )
 
-incidents, rows = fetch_all_incidents()
-df = pd.DataFrame([{
-    "id": row[0],
-    "date": row[1],
-    "incident_type": row[2],
-    "severity": row[3],
-    "status": row[4],
-    "description": row[5]
-} for row in rows]) if rows else pd.DataFrame()
 
 tab1, tab2, tab3, tab4, tab5 = st.tabs(["All Incidents", "Add New", "Update Status", "Delete Incident", "AI Analysis"])
 
 with tab1:
     st.subheader("All Incidents")
 
+    search_text = st.text_input("Search descriptions", placeholder="e.g. ransomware finance")
+    col1, col2 = st.columns(2)
+    status_filter = col1.multiselect("Status", ["Open", "Investigating", "Closed"])
+    severity_filter = col2.multiselect("Severity", ["Low", "Medium", "High", "Critical"])
+    filters = {}
+    if status_filter:
+        filters["status"] = status_filter
+    if severity_filter:
+        filters["severity"] = severity_filter
+
+    # One cursor per page visited, so "Previous" can step back; a change
+    # of filters starts again from the first page
+    filter_key = (tuple(status_filter), tuple(severity_filter))
+    if st.session_state.get("incident_filter_key") != filter_key:
+        st.session_state.incident_filter_key = filter_key
+        st.session_state.incident_cursors = [None]
+    cursors = st.session_state.incident_cursors
+
+    snippets = {}
+    if search_text.strip():
+        # Best full-text matches (FTS5, ranked by BM25) within the filters
+        results = db.search("cyber_incidents", search_text, INCIDENT_COLUMNS, filters, INCIDENT_PAGE_SIZE)
+        incidents = [to_incident(row) for row in results]
+        snippets = {row[0]: row[-1] for row in results}
+        next_cursor = None
+    else:
+        incidents, next_cursor = db.fetch_page(
+            "cyber_incidents", INCIDENT_COLUMNS, filters, cursors[-1],
+            INCIDENT_PAGE_SIZE, mapper=to_incident
+        )
+        if not incidents and len(cursors) > 1:
+            # The page emptied (e.g. after deletes); go back to the first one
+            st.session_state.incident_cursors = [None]
+            st.rerun()
+
     if len(incidents) > 0:
         incident_data = pd.DataFrame([{
             "ID": inc.get_id(),
@@ -79,25 +107,50 @@ with tab1:
             "Description": inc.get_description()
         } for inc in incidents])
 
-        st.dataframe(incident_data, use_container_width=True)
+        if snippets:
+            st.caption(f"Top {len(incidents)} matches, best first")
+            for inc in incidents:
+                st.markdown(
+                    f"**#{inc.get_id()}** {inc.get_incident_type()} · {inc.get_severity()} · "
+                    f"{inc.get_status()} — {snippets[inc.get_id()]}"
+                )
+        else:
+            st.dataframe(incident_data, use_container_width=True)
+
+            col1, col2, col3 = st.columns([1, 1, 4])
+            if col1.button("Previous", disabled=len(cursors) == 1):
+                cursors.pop()
+                st.rerun()
+            if col2.button("Next", disabled=next_cursor is None):
+                cursors.append(next_cursor)
+                st.rerun()
+            col3.caption(f"Page {len(cursors)}")
         st.divider()
 
+        # Metrics cover the whole table, so they are counted in SQL rather
+        # than from the page on screen
         st.subheader("Security Metrics")
         col1, col2, col3 = st.columns(3)
 
-        threats_detected = sum(1 for inc in incidents if inc.get_status() == 'Open')
+        threats_detected = db.fetch_one(
+            "SELECT COUNT(*) FROM cyber_incidents WHERE status = 'Open'"
+        )[0]
         col1.metric("Threats Detected", threats_detected)
 
-        vulnerabilities = sum(1 for inc in incidents if inc.get_severity_level() >= 3)
+        vulnerabilities = db.fetch_one(
+            "SELECT COUNT(*) FROM cyber_incidents WHERE severity IN ('High', 'Critical')"
+        )[0]
         col2.metric("Vulnerabilities", vulnerabilities)
 
-        incidents_count = len(incidents)
+        incidents_count = db.fetch_one("SELECT COUNT(*) FROM cyber_incidents")[0]
         col3.metric("Incidents", incidents_count)
 
         st.divider()
         st.subheader("Threat Distribution")
-        threat_data = pd.DataFrame([inc.get_incident_type() for inc in incidents], columns=["Type"])
-        threat_counts = threat_data['Type'].value_counts()
+        threat_data = pd.DataFrame(db.fetch_all(
+            "SELECT incident_type, COUNT(*) FROM cyber_incidents GROUP BY incident_type ORDER BY COUNT(*) DESC"
+        ), columns=["Type", "count"])
+        threat_counts = threat_data.set_index("Type")["count"]
         st.bar_chart(threat_counts)
 
     else:
@@ -128,6 +181,7 @@ with tab2:
 
 with tab3:
     st.subheader("Update Incident Status")
+    st.caption(f"Incidents on page {len(cursors)} of All Incidents")
     if len(incidents) > 0:
         incident_options = {
             inc.get_id(): f"ID {inc.get_id()}: {inc.get_incident_type()} - {inc.get_severity()}"
@@ -151,11 +205,19 @@ with tab3:
             update_btn = st.form_submit_button("Update Incident", type="primary")
 
             if update_btn:
-                # Update using DatabaseManager
-                db.execute_query(
-                    "UPDATE cyber_incidents SET status = ?, severity = ? WHERE id = ?",
-                    (new_status, new_severity, selected_id)
-                )
+                # Write only the fields that changed, committed together
+                # as one job on the shared writer
+                with db.transaction():
+                    if new_status != selected_incident.get_status():
+                        db.execute_query(
+                            "UPDATE cyber_incidents SET status = ? WHERE id = ?",
+                            (new_status, selected_id)
+                        )
+                    if new_severity != selected_incident.get_severity():
+                        db.execute_query(
+                            "UPDATE cyber_incidents SET severity = ? WHERE id = ?",
+                            (new_severity, selected_id)
+                        )
                 st.success(f"Incident {selected_id} updated successfully!")
                 st.rerun()
     else:
@@ -163,6 +225,7 @@ with tab3:
 
 with tab4:
     st.subheader("Delete Incident")
+    st.caption(f"Incidents on page {len(cursors)} of All Incidents")
     if len(incidents) > 0:
         incident_options = {
             inc.get_id(): f"ID {inc.get_id()}: {inc.get_incident_type()}"
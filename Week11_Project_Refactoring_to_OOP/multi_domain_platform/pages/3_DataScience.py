@@ -1,14 +1,19 @@
 import streamlit as st
 import pandas as pd
 from services.database_manager import DatabaseManager
+from services.session_manager import get_session_manager
 from services.auth_manager import AuthManager
 from services.ai_assistant import AIAssistant
 from models.dataset import Dataset
 
 st.set_page_config(page_title="Data Science", layout="wide")
 
-db = DatabaseManager("database/intelligence_platform.db")
-db.connect()
+db = DatabaseManager(
+    "database/intelligence_platform.db",
+    profile=st.secrets.get("DB_PROFILE", "dashboard"),
+    group_commit_ms=st.secrets.get("GROUP_COMMIT_MS"),
+    cache_results=st.secrets.get("QUERY_CACHE", False),
+)
 auth = AuthManager(db)
 
 api_key = st.secrets.get("OPENAI_API_KEY")
@@ -18,14 +23,17 @@ if not api_key:
 
 ai = AIAssistant(api_key=api_key, system_prompt="You are a data science expert.")
 
+sessions = get_session_manager(st.secrets.get("SESSION_DB"))
 current_user = st.session_state.get("current_user")
-if current_user is None:
+if current_user is None or sessions.validate_session(st.session_state.get("session_token")) is None:
     st.error("You must log in first.")
     if st.button("Go to Login"):
         st.switch_page("Home.py")
     st.stop()
 
 if st.sidebar.button("Logout"):
+    sessions.end_session(st.session_state.get("session_token"))
+    st.session_state.session_token = None
     st.session_state.current_user = None
     st.session_state.current_role = None
     st.switch_page("Home.py")
@@ -1,13 +1,18 @@
 import streamlit as st
 import pandas as pd
 from services.database_manager import DatabaseManager
+from services.session_manager import get_session_manager
 from services.auth_manager import AuthManager
 from services.ai_assistant import AIAssistant
 from models.it_ticket import ITTicket
 
 st.set_page_config(page_title="IT Operations", layout="wide")
-db = DatabaseManager("database/intelligence_platform.db")
-db.connect()
+db = DatabaseManager(
+    "database/intelligence_platform.db",
+    profile=st.secrets.get("DB_PROFILE", "dashboard"),
+    group_commit_ms=st.secrets.get("GROUP_COMMIT_MS"),
+    cache_results=st.secrets.get("QUERY_CACHE", False),
+)
 auth = AuthManager(db)
 
 api_key = st.secrets.get("OPENAI_API_KEY")
@@ -17,14 +22,17 @@ if not api_key:
 
 ai = AIAssistant(api_key=api_key, system_prompt="You are an IT operations expert.")
 
+sessions = get_session_manager(st.secrets.get("SESSION_DB"))
 current_user = st.session_state.get("current_user")
-if current_user is None:
+if current_user is None or sessions.validate_session(st.session_state.get("session_token")) is None:
     st.error("You must log in first.")
     if st.button("Go to Login"):
         st.switch_page("Home.py")
     st.stop()
 
 if st.sidebar.button("Logout"):
+    sessions.end_session(st.session_state.get("session_token"))
+    st.session_state.session_token = None
     st.session_state.current_user = None
     st.session_state.current_role = None
     st.switch_page("Home.py")
@@ -102,10 +110,18 @@ with tab1:
 with tab2:
     st.subheader("AI Assistance / IT Tickets")
 
-    # Fetch tickets from DB using DatabaseManager
-    ticket_rows = db.fetch_all(
-        "SELECT id, subject, priority, status, assigned_to FROM it_tickets"
-    )
+    search_text = st.text_input("Search tickets", placeholder="e.g. vpn remote")
+    ticket_columns = ("id", "subject", "priority", "status", "assigned_to")
+    if search_text.strip():
+        # Best full-text matches on subject and description (FTS5, BM25)
+        ticket_rows = db.search("it_tickets", search_text, ticket_columns, limit=50)
+        for row in ticket_rows:
+            st.markdown(f"**{row[1]}** ({row[3]}) — {row[-1]}")
+    else:
+        # Fetch tickets from DB using DatabaseManager
+        ticket_rows = db.fetch_all(
+            "SELECT id, subject, priority, status, assigned_to FROM it_tickets"
+        )
     tickets: list[ITTicket] = [
         ITTicket(
             ticket_id=row[0],
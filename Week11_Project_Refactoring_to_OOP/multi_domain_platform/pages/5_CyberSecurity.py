@@ -1,64 +1,86 @@
 import streamlit as st
 import pandas as pd
+from collections import Counter
 
 from services.database_manager import DatabaseManager
+from services.session_manager import get_session_manager
 from models.security_incident import SecurityIncident
 
 st.set_page_config(page_title="Cybersecurity", layout="wide")
-if not st.session_state.get("logged_in", False):
+sessions = get_session_manager(st.secrets.get("SESSION_DB"))
+current_user = st.session_state.get("current_user")
+if current_user is None or sessions.validate_session(st.session_state.get("session_token")) is None:
     st.error("You must log in first.")
     if st.button("Go to Login"):
         st.switch_page("Home.py")
     st.stop()
 
 if st.sidebar.button("Logout"):
-    st.session_state.logged_in = False
-    st.session_state.username = ""
-    st.session_state.role = ""
+    sessions.end_session(st.session_state.get("session_token"))
+    st.session_state.session_token = None
+    st.session_state.current_user = None
+    st.session_state.current_role = None
     st.switch_page("Home.py")
 
 st.title("Cybersecurity")
 st.subheader("Security metrics and threat monitoring")
 
-db = DatabaseManager("database/intelligence_platform.db")
-db.connect()
-
-all_rows = db.fetch_all(
-    """
-    SELECT id, incident_type, severity, status, description
-    FROM cyber_incidents
-    ORDER BY id DESC
-    """
+db = DatabaseManager(
+    "database/intelligence_platform.db",
+    profile=st.secrets.get("DB_PROFILE", "dashboard"),
+    group_commit_ms=st.secrets.get("GROUP_COMMIT_MS"),
+    cache_results=st.secrets.get("QUERY_CACHE", False),
 )
 
-all_incidents: list[SecurityIncident] = []
-for row in all_rows:
-    incident = SecurityIncident(
+RECENT_INCIDENTS = 10
+
+
+def to_incident(row):
+    """Convert an incident row to a SecurityIncident object."""
+    return SecurityIncident(
         incident_id=row[0],
         incident_type=row[1],
         severity=row[2],
         status=row[3],
         description=row[4],
     )
-    all_incidents.append(incident)
+
+
+# One streamed pass over the table: each row becomes a model, is counted
+# and dropped, so memory stays flat however many incidents there are
+threats_detected = 0
+vulnerabilities = 0
+total_incidents = 0
+threat_type_counts = Counter()
+severity_counts = Counter()
+recent_incidents: list[SecurityIncident] = []
+for inc in db.fetch_iter(
+    """
+    SELECT id, incident_type, severity, status, description
+    FROM cyber_incidents
+    ORDER BY id DESC
+    """,
+    mapper=to_incident,
+):
+    total_incidents += 1
+    threats_detected += inc.get_status() == 'Open'
+    vulnerabilities += inc.get_severity_level() >= 3
+    threat_type_counts[inc.get_incident_type()] += 1
+    severity_counts[inc.get_severity()] += 1
+    if len(recent_incidents) < RECENT_INCIDENTS:
+        recent_incidents.append(inc)
 
 st.write("### Security Metrics")
 col1, col2, col3 = st.columns(3)
 
-threats_detected = sum(1 for inc in all_incidents if inc.get_status() == 'Open')
-vulnerabilities = sum(1 for inc in all_incidents if inc.get_severity_level() >= 3)
-total_incidents = len(all_incidents)
-
 with col1: st.metric("Threats Detected", threats_detected)
 with col2: st.metric("Vulnerabilities", vulnerabilities)
 with col3: st.metric("Incidents", total_incidents)
 st.divider()
 
 st.write("### Threat Distribution")
-if len(all_incidents) > 0:
-    threat_types = [inc.get_incident_type() for inc in all_incidents]
-    threat_df = pd.DataFrame(threat_types, columns=["threat_type"])
-    threat_counts = threat_df['threat_type'].value_counts()
+if total_incidents > 0:
+    threat_counts = pd.Series(threat_type_counts, name="count").sort_values(ascending=False)
     st.bar_chart(threat_counts)
 else:
     threat_data = pd.DataFrame({
@@ -102,8 +124,6 @@ st.divider()
 
 st.write("### Recent Security Incidents")
 
-recent_incidents = all_incidents[:10] if len(all_incidents) > 10 else all_incidents
-
 if len(recent_incidents) > 0:
     df = pd.DataFrame([
         {
@@ -123,10 +143,7 @@ st.divider()
 
 st.write("### Incidents by Severity")
 
-if len(all_incidents) > 0:
-    severity_data = [inc.get_severity() for inc in all_incidents]
-    severity_df = pd.DataFrame(severity_data, columns=["Severity"])
-    severity_counts = severity_df["Severity"].value_counts()
-    st.bar_chart(severity_counts)
+if total_incidents > 0:
+    st.bar_chart(pd.Series(severity_counts, name="count").sort_values(ascending=False))
 else:
     st.info("No data available.")
\ No newline at end of file
@@ -1,11 +1,65 @@
+import math
+import time
 import bcrypt
 from models.user import User
+from services.password_blocklist import is_breached_password
+
+DEFAULT_BCRYPT_ROUNDS = 12
+MIN_BCRYPT_ROUNDS = 10
+MAX_BCRYPT_ROUNDS = 16
+# Built with: python -m services.password_blocklist build <list.txt> DATA/breached_passwords.bin
+BREACHED_PASSWORDS_FILE = "DATA/breached_passwords.bin"
+
+_calibrated_rounds = {}
+
+
+def calibrate_bcrypt_rounds(target_ms=150, min_rounds=MIN_BCRYPT_ROUNDS,
+                            max_rounds=MAX_BCRYPT_ROUNDS):
+    """
+    Benchmark bcrypt on this machine and return the cost factor whose
+    verify time is closest to `target_ms`.
+
+    Each extra round doubles the work, so one timing at `min_rounds` is
+    enough to extrapolate. The result is clamped to [min_rounds, max_rounds].
+    """
+    password = b"calibration-password"
+    salt = bcrypt.gensalt(rounds=min_rounds)
+
+    # Best of three to ignore one-off scheduler noise
+    elapsed_ms = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        bcrypt.hashpw(password, salt)
+        elapsed_ms = min(elapsed_ms, (time.perf_counter() - start) * 1000)
+
+    extra_rounds = round(math.log2(target_ms / max(elapsed_ms, 0.001)))
+    return max(min_rounds, min(max_rounds, min_rounds + extra_rounds))
+
+
+def get_calibrated_rounds(target_ms=150):
+    """Calibrate once per process and reuse the result on later reruns."""
+    if target_ms not in _calibrated_rounds:
+        _calibrated_rounds[target_ms] = calibrate_bcrypt_rounds(target_ms)
+    return _calibrated_rounds[target_ms]
+
+
+def get_hash_rounds(hashed):
+    """Return the cost factor stored in a bcrypt hash, or None if malformed."""
+    try:
+        return int(hashed.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
 class SimpleHasher:
     """Handles password hashing and verification."""
 
+    def __init__(self, rounds=DEFAULT_BCRYPT_ROUNDS):
+        self.rounds = rounds
+
     def hash_password(self, plain):
         """Hash a plain text password."""
-        salt = bcrypt.gensalt()
+        salt = bcrypt.gensalt(rounds=self.rounds)
         hashed = bcrypt.hashpw(plain.encode('utf-8'), salt)
         return hashed.decode('utf-8')
 
@@ -13,15 +67,35 @@ class SimpleHasher:
         """Check if password matches hash."""
         return bcrypt.checkpw(plain.encode('utf-8'), hashed.encode('utf-8'))
 
+    def needs_rehash(self, hashed):
+        """True if the hash was made with a different cost than ours."""
+        return get_hash_rounds(hashed) != self.rounds
+
 class AuthManager:
     """Handles user registration and login."""
 
-    def __init__(self, db):
+    def __init__(self, db, hasher=None, credential_cache=None,
+                 blocklist_path=BREACHED_PASSWORDS_FILE):
+        """
+        `hasher` can be any object with the SimpleHasher interface, e.g.
+        PooledHasher to move bcrypt off the Streamlit script thread.
+        Defaults to SimpleHasher.
+
+        `credential_cache` (a CredentialCache) is optional; when given,
+        repeat logins within its TTL skip bcrypt.
+
+        `blocklist_path` points at a breached-password blocklist; new
+        passwords found in it are refused. Missing file = no check.
+        """
         self.db = db
-        self.hasher = SimpleHasher()
+        self.hasher = hasher if hasher is not None else SimpleHasher()
+        self.credential_cache = credential_cache
+        self.blocklist_path = blocklist_path
 
     def register_user(self, username, password, role="user"):
         """Register a new user with hashed password."""
+        if is_breached_password(password, self.blocklist_path):
+            raise ValueError("This password has appeared in a data breach, choose another.")
         password_hash = self.hasher.hash_password(password)
         self.db.execute_query(
             "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
@@ -40,7 +114,28 @@ class AuthManager:
 
         username_db, password_hash_db, role_db = row
 
+        cache = self.credential_cache
+        if cache is not None and cache.check(username_db, password, password_hash_db):
+            return User(username_db, password_hash_db, role_db)
+
         if self.hasher.check_password(password, password_hash_db):
+            if self.hasher.needs_rehash(password_hash_db):
+                try:
+                    password_hash_db = self.rehash_password(username_db, password)
+                except Exception as e:
+                    # Keep the old hash; the next login will try again
+                    print(f"Could not rehash password for {username_db}: {e}")
+            if cache is not None:
+                cache.remember(username_db, password, password_hash_db)
             return User(username_db, password_hash_db, role_db)
         else:
             return None
+
+    def rehash_password(self, username, password):
+        """Re-hash a verified password at the current cost and store it."""
+        new_hash = self.hasher.hash_password(password)
+        self.db.execute_query(
+            "UPDATE users SET password_hash = ? WHERE username = ?",
+            (new_hash, username)
+        )
+        return new_hash
@@ -0,0 +1,148 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from database.db import apply_profile, get_profile_name
+
+# Compiled statements each connection keeps (sqlite3's own LRU, keyed by
+# SQL text), so a page's fixed queries are parsed once per connection
+STATEMENT_CACHE_SIZE = 256
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection became free in time."""
+
+
+class ConnectionPool:
+    """
+    A fixed-size pool of SQLite connections to one database file.
+
+    Connections are checked out for one unit of work and handed back, so
+    any Streamlit script thread can use any idle connection (they are opened
+    with check_same_thread=False; the pool makes sure only one thread uses a
+    connection at a time). A connection that has been idle for longer than
+    `health_check_interval` seconds is pinged before reuse and replaced if
+    it no longer works. Every connection gets the same tuning profile from
+    database/db.py (journal mode, synchronous, cache, mmap, busy timeout)
+    and an LRU of `statement_cache_size` compiled statements.
+
+    Use ConnectionPool.shared(db_path) to get the process-wide pool for a
+    file, so every page reuses the same warm connections across reruns.
+    """
+
+    _shared: Dict[str, "ConnectionPool"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, db_path: str, size: int = 5, timeout: float = 10.0,
+                 health_check_interval: float = 30.0, profile: Optional[str] = None,
+                 statement_cache_size: int = STATEMENT_CACHE_SIZE):
+        self.db_path = db_path
+        self.profile = get_profile_name(profile)
+        self.size = size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.statement_cache_size = statement_cache_size
+        # LIFO so the most recently used (warmest) connection goes out first
+        self._idle: "queue.LifoQueue" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+
+    @classmethod
+    def shared(cls, db_path: str, **kwargs) -> "ConnectionPool":
+        """Return the process-wide pool for `db_path`, creating it on first use."""
+        if db_path == ":memory:":
+            # Every connection would be its own empty database, so in-memory
+            # databases get a private single-connection pool instead
+            return cls(db_path, **{**kwargs, "size": 1})
+
+        key = os.path.abspath(db_path)
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(db_path, **kwargs)
+            return cls._shared[key]
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, cached_statements=self.statement_cache_size
+        )
+        return apply_profile(conn, self.profile)
+
+    def _is_healthy(self, conn: sqlite3.Connection) -> bool:
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def acquire(self) -> sqlite3.Connection:
+        """Check out a connection, opening one if the pool is not full yet."""
+        try:
+            conn, idle_since = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._opened < self.size
+                if can_open:
+                    self._opened += 1
+            if can_open:
+                try:
+                    return self._open()
+                except Exception:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+            try:
+                conn, idle_since = self._idle.get(timeout=self.timeout)
+            except queue.Empty:
+                raise PoolTimeoutError(
+                    f"No database connection free after {self.timeout}s "
+                    f"(pool size {self.size})"
+                )
+
+        if time.monotonic() - idle_since > self.health_check_interval and not self._is_healthy(conn):
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+            conn = self._open()
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """Return a connection; any transaction left open is rolled back."""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            # Broken connection: drop it so a fresh one can be opened later
+            with self._lock:
+                self._opened -= 1
+            return
+        self._idle.put((conn, time.monotonic()))
+
+    @contextmanager
+    def connection(self):
+        """`with pool.connection() as conn:` checks a connection out and back in."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def stats(self) -> Dict[str, int]:
+        """Return how many connections are open and how many are idle."""
+        with self._lock:
+            return {"size": self.size, "open": self._opened, "idle": self._idle.qsize()}
+
+    def close_all(self) -> None:
+        """Close every idle connection (checked-out ones close on release)."""
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._opened -= 1
@@ -0,0 +1,81 @@
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+class CredentialCache:
+    """
+    Remembers recent successful password checks so Streamlit reruns and
+    re-logins don't pay for bcrypt again within a few seconds.
+
+    Entries hold a keyed HMAC of username + password (the key is random per
+    process and never stored), the password hash that was verified, and an
+    expiry time. An entry only matches if the user's current password_hash
+    is still the one it was made for, so a password change or rehash
+    invalidates it automatically.
+    """
+
+    def __init__(self, ttl: float = 60, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._key = secrets.token_bytes(32)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _digest(self, username: str, password: str) -> bytes:
+        message = username.encode('utf-8') + b"\0" + password.encode('utf-8')
+        return hmac.new(self._key, message, hashlib.sha256).digest()
+
+    def check(self, username: str, password: str, password_hash: str) -> bool:
+        """True if this exact login was verified against `password_hash` recently."""
+        digest = self._digest(username, password)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is not None:
+                cached_digest, cached_hash, expires_at = entry
+                if expires_at < now or cached_hash != password_hash:
+                    del self._entries[username]
+                elif hmac.compare_digest(cached_digest, digest):
+                    self._entries.move_to_end(username)
+                    self.hits += 1
+                    return True
+            self.misses += 1
+            return False
+
+    def remember(self, username: str, password: str, password_hash: str) -> None:
+        """Record a successful bcrypt verification."""
+        entry = (self._digest(username, password), password_hash, time.monotonic() + self.ttl)
+        with self._lock:
+            self._entries[username] = entry
+            self._entries.move_to_end(username)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def forget(self, username: str) -> None:
+        """Drop any cached verification for `username`."""
+        with self._lock:
+            self._entries.pop(username, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_shared_cache: Optional[CredentialCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_credential_cache(ttl: float = 60, max_entries: int = 1024) -> CredentialCache:
+    """Return the process-wide CredentialCache, creating it on first use."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = CredentialCache(ttl=ttl, max_entries=max_entries)
+        return _shared_cache
@@ -1,40 +1,301 @@
-import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from database.db import describe_connection
+from database.pagination import DEFAULT_PAGE_SIZE, build_page_query, split_page
+from database.schema import create_all_tables
+from database.search import DEFAULT_SEARCH_LIMIT, build_search_query
+from services.connection_pool import ConnectionPool
+from services.group_commit import GroupCommitter, WriteResult
+from services.query_cache import QueryCache, read_tables, written_table
+
+# Rows pulled from SQLite per fetchmany() call when streaming
+DEFAULT_ARRAYSIZE = 500
+
 
 class DatabaseManager:
-    def __init__(self, db_path):
+    # Database files whose schema migrations ran in this process
+    _migrated = set()
+    _migrate_lock = threading.Lock()
+
+    def __init__(self, db_path, pool=None, profile=None, group_commit_ms=None, cache_results=False):
+        """
+        Queries run on connections from `pool`, by default the process-wide
+        ConnectionPool for `db_path`, so every page and rerun shares the
+        same warm connections. `profile` names a connection profile from
+        database/db.py; it only takes effect when the shared pool is created.
+
+        Every write, including each transaction() block as a whole, goes
+        through the shared GroupCommitter for the file, the one writer
+        every session hands its writes to. group_commit_ms makes it wait
+        that many milliseconds for more writes before each commit (by
+        default it only batches what is already queued).
+
+        With cache_results=True, fetch_all, fetch_one and fetch_page answer
+        repeated reads from the shared QueryCache for the file until a
+        write through any DatabaseManager touches one of their tables.
+        """
         self.db_path = db_path
+        self.pool = pool if pool is not None else ConnectionPool.shared(db_path, profile=profile)
         self.connection = None
+        self.committer = None
+        if db_path != ":memory:":
+            self.committer = GroupCommitter.shared(
+                db_path, window_ms=float(group_commit_ms or 0), profile=self.pool.profile
+            )
+        self._tx_statements = None
+        self._tx_tables = set()
+        # Every manager for the file bumps the shared write generations,
+        # whether or not it reads from the cache itself
+        self.cache = QueryCache() if db_path == ":memory:" else QueryCache.shared(db_path)
+        self.cache_results = bool(cache_results)
+        self._migrate()
+
+    def _migrate(self):
+        """
+        Create missing tables and apply pending index/search migrations
+        (database/schema.py), once per database file per process.
+        """
+        with DatabaseManager._migrate_lock:
+            if self.db_path in DatabaseManager._migrated:
+                return
+            with self.pool.connection() as conn:
+                create_all_tables(conn)
+            if self.db_path != ":memory:":
+                DatabaseManager._migrated.add(self.db_path)
 
     def connect(self):
-        """Connect to the SQLite database if not already connected."""
+        """
+        Check out a pooled connection and keep it for this manager until
+        close(). Only needed for code that wants the raw connection; the
+        query methods check connections out by themselves.
+        """
         if self.connection is None:
-            self.connection = sqlite3.connect(self.db_path)
+            self.connection = self.pool.acquire()
         return self.connection
 
+    def _checkout(self):
+        """Use the held connection if there is one, else borrow one from the pool."""
+        if self.connection is not None:
+            return _Borrowed(self.connection, None)
+        return _Borrowed(self.pool.acquire(), self.pool)
+
+    def _read(self, sql, params, one):
+        """Run a read, through the result cache when it is on and usable."""
+        params = tuple(params)
+        tables = read_tables(sql) if self.cache_results else ()
+        key = (sql, params, one)
+        try:
+            hash(key)
+        except TypeError:
+            tables = ()
+        if tables:
+            now = time.monotonic()
+            hit, rows = self.cache.get(key, tables, now)
+            if hit:
+                return rows
+            generations = self.cache.generations(tables)
+
+        with self._checkout() as conn:
+            cur = conn.cursor()
+            cur.execute(sql, params)
+            rows = cur.fetchone() if one else cur.fetchall()
+        if tables:
+            self.cache.put(key, generations, now, rows)
+        return rows
+
     def fetch_all(self, sql, params=()):
         """Fetch all rows from a query."""
-        conn = self.connect()
-        cur = conn.cursor()
-        cur.execute(sql, tuple(params))
-        return cur.fetchall()
+        return list(self._read(sql, params, one=False))
 
     def fetch_one(self, sql, params=()):
         """Fetch a single row from a query."""
-        conn = self.connect()
-        cur = conn.cursor()
-        cur.execute(sql, tuple(params))
-        return cur.fetchone()
+        return self._read(sql, params, one=True)
+
+    def fetch_batches(self, sql, params=(), size=DEFAULT_ARRAYSIZE, mapper=None):
+        """
+        Yield the rows of a query as lists of at most `size` rows, so only
+        one batch is in memory at a time. If `mapper` is given, each row is
+        replaced by mapper(row), e.g. to build model objects on the fly.
+
+        The connection stays checked out until the generator is exhausted
+        or closed, so don't leave one half-read.
+        """
+        with self._checkout() as conn:
+            cur = conn.cursor()
+            cur.arraysize = size
+            cur.execute(sql, tuple(params))
+            while True:
+                rows = cur.fetchmany()
+                if not rows:
+                    break
+                yield [mapper(row) for row in rows] if mapper else rows
+
+    def fetch_iter(self, sql, params=(), arraysize=DEFAULT_ARRAYSIZE, mapper=None):
+        """Yield the rows of a query one at a time (see fetch_batches)."""
+        for batch in self.fetch_batches(sql, params, arraysize, mapper):
+            yield from batch
+
+    def fetch_page(self, table, columns=None, filters=None, cursor=None,
+                   page_size=DEFAULT_PAGE_SIZE, order_by="id", descending=True, mapper=None):
+        """
+        Fetch one keyset-paginated page of `table` (see database/pagination.py).
+        Returns (rows, next_cursor); pass next_cursor back in for the next
+        page. It is None on the last page.
+        """
+        sql, params, page_size = build_page_query(
+            table, columns, filters, cursor, page_size, order_by, descending
+        )
+        rows, next_cursor = split_page(self._read(sql, params, one=False), page_size, order_by)
+        if mapper:
+            rows = [mapper(row) for row in rows]
+        return rows, next_cursor
+
+    def search(self, table, text, columns=None, filters=None,
+               limit=DEFAULT_SEARCH_LIMIT, mapper=None):
+        """
+        Ranked full-text search of `table` (see database/search.py), best
+        match first. Each row holds the selected columns followed by the
+        BM25 score and a snippet with the matches in **bold**; with
+        `mapper`, rows are passed through mapper(row) instead.
+        """
+        sql, params = build_search_query(table, text, columns, filters, limit)
+        if sql is None:
+            return []
+        rows = self._read(sql, params, one=False)
+        return [mapper(row) for row in rows] if mapper else list(rows)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Run several writes as one unit with a single commit:
+
+            with db.transaction():
+                db.execute_query(...)
+                db.execute_query(...)
+
+        Writes on this manager inside the block are held back and handed
+        to the shared GroupCommitter as one job when the block ends, so
+        they go through the same single writer as every other write and
+        commit together; if one of them fails none is kept and the error
+        is raised from the with statement. Nothing is written if the block
+        raises. Results only exist after the commit, so execute_query and
+        execute_many return None inside the block, and reads inside it
+        don't see its writes yet. A nested transaction() joins the outer
+        one. On commit the cached results for the tables written are
+        dropped.
+        """
+        if self._tx_statements is not None:
+            yield
+            return
+        self._tx_statements = []
+        self._tx_tables = set()
+        try:
+            yield
+            statements, tables = self._tx_statements, self._tx_tables
+        finally:
+            self._tx_statements = None
+        if statements:
+            self._write(statements)
+            self.cache.invalidate(tables)
+
+    def _write(self, statements):
+        """
+        Commit a list of (sql, params, many) statements as one unit, through
+        the shared writer (an in-memory database has none, so its writes
+        run directly on a pooled connection). Returns a WriteResult.
+        """
+        if self.committer is not None:
+            return self.committer.submit(statements).result()
+        with self._checkout() as conn:
+            cur = conn.cursor()
+            rowcount = 0
+            try:
+                for sql, params, many in statements:
+                    if many:
+                        cur.executemany(sql, params)
+                    else:
+                        cur.execute(sql, params)
+                    rowcount += max(cur.rowcount, 0)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            return WriteResult(cur.lastrowid, rowcount)
 
     def execute_query(self, sql, params=()):
-        """Execute a query (INSERT, UPDATE, DELETE)."""
-        conn = self.connect()
-        cur = conn.cursor()
-        cur.execute(sql, tuple(params))
-        conn.commit()
-        return cur
+        """
+        Execute a query (INSERT, UPDATE, DELETE).
+        Returns an object with lastrowid and rowcount (None inside
+        transaction(), where the write is only queued).
+        """
+        statement = (sql, tuple(params), False)
+        if self._tx_statements is not None:
+            self._tx_statements.append(statement)
+            self._wrote(sql)
+            return None
+        result = self._write([statement])
+        self._wrote(sql)
+        return result
+
+    def execute_many(self, sql, seq_of_params):
+        """
+        Execute one statement for every parameter tuple in seq_of_params,
+        with a single commit. Returns the number of rows changed (None
+        inside transaction()).
+        """
+        statement = (sql, [tuple(params) for params in seq_of_params], True)
+        if self._tx_statements is not None:
+            self._tx_statements.append(statement)
+            self._wrote(sql)
+            return None
+        rowcount = self._write([statement]).rowcount
+        self._wrote(sql)
+        return rowcount
+
+    def _wrote(self, sql):
+        """Invalidate cached reads of the table `sql` wrote to."""
+        table = written_table(sql)
+        if self._tx_statements is not None:
+            # Takes effect when the transaction commits
+            self._tx_tables.add(table)
+        else:
+            self.cache.invalidate([table])
+
+    def write_stats(self):
+        """Return the shared writer's queue depth, batch and latency stats."""
+        if self.committer is None:
+            return {}
+        return self.committer.stats()
+
+    def cache_stats(self):
+        """Return the result cache's hit/miss statistics."""
+        return {"enabled": self.cache_results, **self.cache.stats()}
+
+    def settings(self):
+        """Return the profile name and the SQLite settings in effect."""
+        with self._checkout() as conn:
+            return {"profile": self.pool.profile, **describe_connection(conn)}
 
     def close(self):
-        """Close the database connection."""
+        """Hand the held connection back to the pool."""
         if self.connection is not None:
-            self.connection.close()
+            self.pool.release(self.connection)
             self.connection = None
+
+
+class _Borrowed:
+    """Context manager that returns a borrowed connection to its pool."""
+
+    def __init__(self, conn, pool):
+        self.conn = conn
+        self.pool = pool
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, *exc):
+        if self.pool is not None:
+            self.pool.release(self.conn)
+        return False
@@ -0,0 +1,194 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from database.db import apply_profile
+
+
+class WriteResult:
+    """What a committed write reports back (the same attributes as a cursor)."""
+
+    def __init__(self, lastrowid: Optional[int], rowcount: int):
+        self.lastrowid = lastrowid
+        self.rowcount = rowcount
+
+
+class GroupCommitter:
+    """
+    The single writer for one database file: collects writes from every
+    session and commits them together.
+
+    Each write is a list of statements that must succeed or fail as a unit.
+    A background thread owns the only write connection, so sessions never
+    race each other for SQLite's write lock. It takes every write that is
+    waiting (up to `max_batch`), optionally keeps gathering more for
+    `window_ms` milliseconds, runs them all in one transaction and commits
+    once. Each write gets its own SAVEPOINT, so one failing write
+    is rolled back and reported to its caller without affecting the others.
+    Callers block until their write is committed, so one disk sync is
+    shared by the whole group instead of paid by each write.
+    """
+
+    _shared: Dict[str, "GroupCommitter"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, db_path: str, window_ms: float = 0.0, max_batch: int = 256,
+                 profile: Optional[str] = None):
+        self.db_path = db_path
+        self.window_ms = window_ms
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.profile = profile
+        # Autocommit mode: the writer thread issues BEGIN/COMMIT itself
+        self._conn = apply_profile(
+            sqlite3.connect(db_path, check_same_thread=False, isolation_level=None), profile
+        )
+        self._queue: "queue.Queue" = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._writes = 0
+        self._failed = 0
+        self._batches = 0
+        self._total_wait = 0.0
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+        self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def shared(cls, db_path: str, **kwargs) -> "GroupCommitter":
+        """
+        Return the process-wide committer for `db_path`, creating it on
+        first use. Its settings are fixed then; asking for different ones
+        later raises ValueError rather than silently ignoring them.
+        """
+        key = os.path.abspath(db_path)
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(db_path, **kwargs)
+            committer = cls._shared[key]
+            differing = {name: value for name, value in kwargs.items()
+                         if getattr(committer, name) != value}
+            if differing:
+                raise ValueError(
+                    f"The shared writer for {db_path} already runs with different settings "
+                    f"{ {name: getattr(committer, name) for name in differing} }; "
+                    f"restart the app to change them"
+                )
+            return committer
+
+    def submit(self, statements: List[Tuple[str, Sequence, bool]]) -> Future:
+        """
+        Queue one write: a list of (sql, params, many) statements, where
+        many=True means params is a sequence of parameter tuples for
+        executemany. The returned future resolves to a WriteResult once the
+        group containing the write has been committed.
+        """
+        future: Future = Future()
+        self._queue.put((statements, future, time.perf_counter()))
+        return future
+
+    def execute(self, sql: str, params: Sequence = ()) -> WriteResult:
+        """Run one statement through the group and wait for its commit."""
+        return self.submit([(sql, tuple(params), False)]).result()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Return the queue depth, writes and batches committed, failed writes,
+        the average batch size, and the average queue wait and the average
+        and maximum submit-to-commit latency in milliseconds.
+        """
+        with self._stats_lock:
+            done = self._writes + self._failed
+            return {
+                "queue_depth": self._queue.qsize(),
+                "writes": self._writes,
+                "failed": self._failed,
+                "batches": self._batches,
+                "avg_batch_size": round(done / self._batches, 2) if self._batches else 0.0,
+                "avg_wait_ms": round(1000 * self._total_wait / done, 3) if done else 0.0,
+                "avg_latency_ms": round(1000 * self._total_latency / done, 3) if done else 0.0,
+                "max_latency_ms": round(1000 * self._max_latency, 3),
+            }
+
+    def close(self) -> None:
+        """Commit what is queued, then stop the writer thread."""
+        self._queue.put(None)
+        self._thread.join()
+        self._conn.close()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.window
+            stop = False
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        item = self._queue.get(timeout=remaining)
+                    else:
+                        item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._commit_batch(batch)
+            if stop:
+                return
+
+    def _commit_batch(self, batch) -> None:
+        started = time.perf_counter()
+        cur = self._conn.cursor()
+        outcomes = []
+        try:
+            cur.execute("BEGIN IMMEDIATE")
+            for statements, future, _ in batch:
+                cur.execute("SAVEPOINT write")
+                try:
+                    rowcount = 0
+                    for sql, params, many in statements:
+                        if many:
+                            cur.executemany(sql, params)
+                        else:
+                            cur.execute(sql, params)
+                        rowcount += max(cur.rowcount, 0)
+                    cur.execute("RELEASE write")
+                    outcomes.append(WriteResult(cur.lastrowid, rowcount))
+                except Exception as e:
+                    cur.execute("ROLLBACK TO write")
+                    cur.execute("RELEASE write")
+                    outcomes.append(e)
+            cur.execute("COMMIT")
+        except Exception as e:
+            # BEGIN or COMMIT itself failed (e.g. the database stayed
+            # locked): nothing in the group was written
+            if self._conn.in_transaction:
+                self._conn.rollback()
+            outcomes = [e] * len(batch)
+
+        finished = time.perf_counter()
+        with self._stats_lock:
+            self._batches += 1
+            for (_, _, submitted), outcome in zip(batch, outcomes):
+                if isinstance(outcome, Exception):
+                    self._failed += 1
+                else:
+                    self._writes += 1
+                self._total_wait += started - submitted
+                self._total_latency += finished - submitted
+                self._max_latency = max(self._max_latency, finished - submitted)
+
+        for (_, future, _), outcome in zip(batch, outcomes):
+            if isinstance(outcome, Exception):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
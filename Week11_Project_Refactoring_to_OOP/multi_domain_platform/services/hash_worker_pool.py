@@ -0,0 +1,134 @@
+import copy
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Optional
+
+import bcrypt
+
+from services.auth_manager import DEFAULT_BCRYPT_ROUNDS, SimpleHasher
+
+
+class ServerBusyError(Exception):
+    """Raised when the hash pool is full or a request took too long."""
+
+
+def _hash_password(plain: str, rounds: int) -> str:
+    """Worker-side bcrypt hash (must be top level so it can be pickled)."""
+    hashed = bcrypt.hashpw(plain.encode('utf-8'), bcrypt.gensalt(rounds=rounds))
+    return hashed.decode('utf-8')
+
+
+def _check_password(plain: str, hashed: str) -> bool:
+    """Worker-side bcrypt check (must be top level so it can be pickled)."""
+    return bcrypt.checkpw(plain.encode('utf-8'), hashed.encode('utf-8'))
+
+
+class PooledHasher(SimpleHasher):
+    """
+    Drop-in replacement for SimpleHasher that runs bcrypt in worker processes.
+
+    At most `max_pending` requests may be queued or running at once; anything
+    beyond that is rejected straight away with ServerBusyError instead of
+    piling up behind the pool. Each request also waits at most `timeout`
+    seconds for its result.
+
+    Hashers made with with_rounds() share the worker processes and the
+    queue limit; only the bcrypt cost differs.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_pending: int = 32,
+                 timeout: float = 5.0, rounds: int = DEFAULT_BCRYPT_ROUNDS):
+        super().__init__(rounds=rounds)
+        # spawn avoids forking Streamlit's threads into the workers
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._in_flight = set()
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+
+    def with_rounds(self, rounds: int) -> "PooledHasher":
+        """Return a hasher on the same pool that hashes at `rounds`."""
+        if rounds == self.rounds:
+            return self
+        hasher = copy.copy(self)
+        hasher.rounds = rounds
+        return hasher
+
+    def _release(self, future) -> None:
+        with self._lock:
+            self._in_flight.discard(future)
+        self._slots.release()
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            raise ServerBusyError("Server busy, please try again in a moment.")
+
+        try:
+            future = self._executor.submit(func, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._in_flight.add(future)
+        # The slot is only freed once the worker is really done, so a timed
+        # out request still counts against the queue depth until it finishes
+        future.add_done_callback(self._release)
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise ServerBusyError("Password check timed out, please try again.")
+
+    def hash_password(self, plain: str) -> str:
+        """Hash a plain text password in the pool."""
+        return self._run(_hash_password, plain, self.rounds)
+
+    def check_password(self, plain: str, hashed: str) -> bool:
+        """Check a password against its hash in the pool."""
+        return self._run(_check_password, plain, hashed)
+
+    def pending(self) -> int:
+        """Return how many requests are queued or running."""
+        with self._lock:
+            return len(self._in_flight)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_shared_hasher: Optional[PooledHasher] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_hasher(rounds: int = DEFAULT_BCRYPT_ROUNDS, **kwargs) -> PooledHasher:
+    """
+    Return a hasher on the process-wide pool, creating the pool on first use.
+
+    Streamlit reruns every page script, so the pool has to live at module
+    level rather than on an AuthManager instance. `rounds` applies to the
+    hasher returned, so a new calibrated cost takes effect straight away.
+    The pool settings (max_workers, max_pending, timeout) are fixed when
+    the pool is created; asking for different ones later raises ValueError.
+    """
+    global _shared_hasher
+    with _shared_lock:
+        if _shared_hasher is None:
+            _shared_hasher = PooledHasher(rounds=rounds, **kwargs)
+        else:
+            differing = {name: value for name, value in kwargs.items()
+                         if getattr(_shared_hasher, name) != value}
+            if differing:
+                raise ValueError(
+                    f"The shared hash pool already runs with different settings "
+                    f"{ {name: getattr(_shared_hasher, name) for name in differing} }; "
+                    f"restart the app to change them"
+                )
+        return _shared_hasher.with_rounds(rounds)
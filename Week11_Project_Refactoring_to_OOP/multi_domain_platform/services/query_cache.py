@@ -0,0 +1,150 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+# Each FROM clause of a query (and its subqueries): up to the next clause
+# keyword. Commas, JOINs, aliases and ON conditions are all inside it.
+FROM_CLAUSE_RE = re.compile(
+    r"\bFROM\b(.*?)(?=\b(?:WHERE|GROUP|HAVING|ORDER|LIMIT|WINDOW|UNION|INTERSECT|EXCEPT|SELECT|FROM)\b|;|$)",
+    re.IGNORECASE | re.DOTALL,
+)
+# A table joined after a subquery can sit outside any FROM clause match
+JOIN_TABLE_RE = re.compile(r"\bJOIN\s+([A-Za-z_]\w*)", re.IGNORECASE)
+IDENTIFIER_RE = re.compile(r"[A-Za-z_]\w*")
+# Words in a FROM clause that aren't names. Aliases and ON columns are
+# kept: they only make a query depend on more tables than it reads.
+FROM_KEYWORDS = {
+    "as", "join", "inner", "left", "right", "full", "outer", "cross", "natural",
+    "on", "using", "and", "or", "not", "is", "null", "in", "indexed", "by",
+}
+# Stands for "every table": a read that depends on it is dropped by any write
+ALL_TABLES = "*"
+WRITE_TABLE_RE = re.compile(
+    r"^\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+([A-Za-z_]\w*)",
+    re.IGNORECASE,
+)
+
+
+def read_tables(sql: str) -> Tuple[str, ...]:
+    """
+    Names of the tables a query reads, lower-cased and sorted. A FROM
+    clause that can't be read with confidence (a subquery in it, or
+    quoted names) gives (ALL_TABLES,), so any write drops the result.
+    """
+    names = set()
+    for clause in FROM_CLAUSE_RE.findall(sql):
+        # A subquery in the clause cuts it off at its SELECT, right after "("
+        if clause.rstrip().endswith("(") or any(quote in clause for quote in "\"`["):
+            return (ALL_TABLES,)
+        names.update(word.lower() for word in IDENTIFIER_RE.findall(clause))
+    names.update(name.lower() for name in JOIN_TABLE_RE.findall(sql))
+    return tuple(sorted(names - FROM_KEYWORDS))
+
+
+def written_table(sql: str) -> Optional[str]:
+    """Name of the table a write statement changes, or None if unknown."""
+    match = WRITE_TABLE_RE.match(sql)
+    return match.group(1).lower() if match else None
+
+
+class QueryCache:
+    """
+    LRU cache of read results for one database file, shared by every
+    session in the process.
+
+    Entries are keyed by SQL text plus parameters and remember the write
+    generation of each table the query reads. Every write through
+    DatabaseManager bumps its table's generation, so the next lookup of a
+    query over that table misses and runs again; nothing is served after
+    the data it came from has changed in this process. A write the cache
+    can't attribute to a table bumps every table.
+
+    Writes made by other processes (e.g. a rebuild from Week 8's main.py)
+    are not seen; set `ttl` to bound how long a result can be reused.
+    """
+
+    _shared: Dict[str, "QueryCache"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_entries: int = 256, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._global_generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @classmethod
+    def shared(cls, db_path: str, **kwargs) -> "QueryCache":
+        """Return the process-wide cache for `db_path`, creating it on first use."""
+        key = os.path.abspath(db_path)
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(**kwargs)
+            return cls._shared[key]
+
+    def generations(self, tables: Iterable[str]) -> Tuple[int, ...]:
+        """Current generation of each table (plus the global one)."""
+        with self._lock:
+            return (self._global_generation,) + tuple(self._generations.get(t, 0) for t in tables)
+
+    def get(self, key, tables: Tuple[str, ...], now: float):
+        """Return (True, rows) for a fresh entry, else (False, None)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                generations, stored_at, rows = entry
+                current = (self._global_generation,) + tuple(self._generations.get(t, 0) for t in tables)
+                if generations == current and (self.ttl is None or now - stored_at < self.ttl):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, rows
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, generations: Tuple[int, ...], now: float, rows) -> None:
+        """
+        Store rows read under `generations` (taken before the query ran, so
+        a write that lands meanwhile makes the entry stale, not wrong).
+        """
+        with self._lock:
+            self._entries[key] = (generations, now, rows)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, tables: Iterable[Optional[str]]) -> None:
+        """Bump the generation of each table; None means "unknown, bump all"."""
+        with self._lock:
+            self.invalidations += 1
+            # Reads that depend on every table go stale on any write
+            self._generations[ALL_TABLES] = self._generations.get(ALL_TABLES, 0) + 1
+            for table in tables:
+                if table is None:
+                    self._global_generation += 1
+                else:
+                    self._generations[table] = self._generations.get(table, 0) + 1
+
+    def stats(self) -> Dict[str, float]:
+        """Return hits, misses, hit rate, invalidations and entry count."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+    def clear(self) -> None:
+        """Drop every entry (statistics are kept)."""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,205 @@
+import hashlib
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+
+class SessionManager:
+    """
+    Issues and validates login session tokens.
+
+    Sessions expire after `idle_ttl` seconds without use and `absolute_ttl`
+    seconds after login, whichever comes first. At most `max_sessions` are
+    kept; the least recently used one is evicted to make room.
+
+    By default sessions live in memory. Pass `db_path` to keep them in a
+    SQLite table instead, so that several worker processes (or a restarted
+    one) can validate the same tokens.
+
+    Only a SHA-256 digest of each token is stored and used as the lookup key,
+    so validation never compares the raw token byte by byte (no timing leak)
+    and a leaked sessions table cannot be replayed.
+    """
+
+    def __init__(self, idle_ttl: int = 30 * 60, absolute_ttl: int = 8 * 60 * 60,
+                 max_sessions: int = 10000, db_path: Optional[str] = None):
+        self.idle_ttl = idle_ttl
+        self.absolute_ttl = absolute_ttl
+        self.max_sessions = max_sessions
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, Dict]" = OrderedDict()
+
+        if db_path is not None:
+            with self._connect() as conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS sessions (
+                        token_hash TEXT PRIMARY KEY,
+                        username TEXT NOT NULL,
+                        role TEXT,
+                        created_at REAL NOT NULL,
+                        last_seen REAL NOT NULL
+                    )
+                """)
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_sessions_last_seen ON sessions(last_seen)"
+                )
+
+    @contextmanager
+    def _connect(self):
+        # A short-lived connection per call keeps this safe across threads;
+        # the inner `with` commits on success and rolls back on error
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _hash_token(token: str) -> str:
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    def _is_expired(self, created_at: float, last_seen: float, now: float) -> bool:
+        return (now - last_seen > self.idle_ttl
+                or now - created_at > self.absolute_ttl)
+
+    def create_session(self, username: str, role: str = None) -> str:
+        """Start a session for `username` and return its token."""
+        token = secrets.token_urlsafe(32)
+        token_hash = self._hash_token(token)
+        now = time.time()
+
+        if self.db_path is None:
+            with self._lock:
+                self._sessions[token_hash] = {
+                    "username": username,
+                    "role": role,
+                    "created_at": now,
+                    "last_seen": now,
+                }
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            return token
+
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO sessions (token_hash, username, role, created_at, last_seen) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (token_hash, username, role, now, now)
+            )
+            # Evict the least recently used sessions above the cap
+            conn.execute(
+                """
+                DELETE FROM sessions WHERE token_hash IN (
+                    SELECT token_hash FROM sessions
+                    ORDER BY last_seen DESC
+                    LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_sessions,)
+            )
+        return token
+
+    def validate_session(self, token: Optional[str]) -> Optional[Dict]:
+        """
+        Return {"username", "role"} for a live token, else None.
+        A successful check refreshes the idle timer.
+        """
+        if not token:
+            return None
+        token_hash = self._hash_token(token)
+        now = time.time()
+
+        if self.db_path is None:
+            with self._lock:
+                session = self._sessions.get(token_hash)
+                if session is None:
+                    return None
+                if self._is_expired(session["created_at"], session["last_seen"], now):
+                    del self._sessions[token_hash]
+                    return None
+                session["last_seen"] = now
+                self._sessions.move_to_end(token_hash)
+                return {"username": session["username"], "role": session["role"]}
+
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT token_hash, username, role, created_at, last_seen "
+                "FROM sessions WHERE token_hash = ?",
+                (token_hash,)
+            ).fetchone()
+            if row is None:
+                return None
+            if self._is_expired(row[3], row[4], now):
+                conn.execute("DELETE FROM sessions WHERE token_hash = ?", (token_hash,))
+                return None
+            conn.execute(
+                "UPDATE sessions SET last_seen = ? WHERE token_hash = ?",
+                (now, token_hash)
+            )
+            return {"username": row[1], "role": row[2]}
+
+    def end_session(self, token: Optional[str]) -> None:
+        """Invalidate a token (logout)."""
+        if not token:
+            return
+        token_hash = self._hash_token(token)
+
+        if self.db_path is None:
+            with self._lock:
+                self._sessions.pop(token_hash, None)
+            return
+
+        with self._connect() as conn:
+            conn.execute("DELETE FROM sessions WHERE token_hash = ?", (token_hash,))
+
+    def purge_expired(self) -> int:
+        """Drop every expired session and return how many were removed."""
+        now = time.time()
+
+        if self.db_path is None:
+            with self._lock:
+                expired = [
+                    token_hash for token_hash, s in self._sessions.items()
+                    if self._is_expired(s["created_at"], s["last_seen"], now)
+                ]
+                for token_hash in expired:
+                    del self._sessions[token_hash]
+            return len(expired)
+
+        with self._connect() as conn:
+            cur = conn.execute(
+                "DELETE FROM sessions WHERE last_seen < ? OR created_at < ?",
+                (now - self.idle_ttl, now - self.absolute_ttl)
+            )
+            return cur.rowcount
+
+    def count(self) -> int:
+        """Return the number of stored sessions (including expired ones not yet purged)."""
+        if self.db_path is None:
+            with self._lock:
+                return len(self._sessions)
+
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+
+_shared_sessions: Optional[SessionManager] = None
+_shared_lock = threading.Lock()
+
+
+def get_session_manager(db_path: Optional[str] = None) -> SessionManager:
+    """
+    Return the process-wide SessionManager, creating it on first use.
+    `db_path` switches on the SQLite-backed mode (first call wins).
+    """
+    global _shared_sessions
+    with _shared_lock:
+        if _shared_sessions is None:
+            _shared_sessions = SessionManager(db_path=db_path)
+        return _shared_sessions
@@ -0,0 +1,267 @@
+"""
+Authentication throughput benchmark for the auth stacks in this repo:
+
+    week07_flatfile      Week07 auth.py (users.txt)
+    week08_user_service  Week08 app/services/user_service.py (SQLite, functions)
+    week10_users         Week10 app/data/users.py (SQLite, functions)
+    week11_auth_manager  Week11 AuthManager + DatabaseManager (SQLite, OOP)
+
+For every stack and every client count it registers N synthetic users and
+then logs each of them in, recording per-operation latency. Results are
+written as JSON (latency percentiles in ms and throughput in ops/s).
+
+Usage:
+    python benchmarks/auth_benchmark.py --users 200 --clients 1 4 16 64 --output results.json
+
+Each stack runs in its own subprocess inside a temporary directory, since
+the Week08 and Week10 projects both use a top-level `app` package and
+resolve their database path relative to the working directory.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+STACK_DIRS = {
+    "week07_flatfile": REPO_ROOT / "Week07_Building_a_Secure_Authentication_System",
+    "week08_user_service": REPO_ROOT / "Week08_LAB_Hybrid",
+    "week10_users": REPO_ROOT / "Week10_AI_Integration_with_ChatGpt",
+    "week11_auth_manager": REPO_ROOT / "Week11_Project_Refactoring_to_OOP" / "multi_domain_platform",
+}
+
+PASSWORD = "BenchPass123!"
+
+
+# ---------------------------------------------------------------------------
+# Stack adapters. Each returns a factory that builds one (register, login)
+# pair per client thread; both callables return True on success.
+# ---------------------------------------------------------------------------
+
+def setup_week07(rounds):
+    import auth
+
+    auth.USER_DATA_FILE = "users.txt"
+    auth.BCRYPT_ROUNDS = rounds
+
+    def make_client():
+        return (lambda u, p: auth.register_user(u, p),
+                lambda u, p: auth.login_user(u, p))
+    return make_client
+
+
+def setup_week08(rounds):
+    os.makedirs("DATA", exist_ok=True)
+    from app.data.db import connect_database
+    from app.data.schema import create_users_table
+    from app.services import user_service
+
+    conn = connect_database()
+    create_users_table(conn)
+    conn.close()
+    user_service.BCRYPT_ROUNDS = rounds
+
+    def make_client():
+        return (lambda u, p: user_service.register_user(u, p)[0],
+                lambda u, p: user_service.login_user(u, p)[0])
+    return make_client
+
+
+def setup_week10(rounds):
+    os.makedirs("DATA", exist_ok=True)
+    import bcrypt
+    from app.data.db import connect_database
+    from app.data.schema import create_users_table
+    from app.data import users
+
+    conn = connect_database()
+    create_users_table(conn)
+    conn.close()
+
+    def make_client():
+        # Same calls as the Week10 Home.py forms, on one connection per client
+        conn = connect_database()
+
+        def register(username, password):
+            hashed = bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=rounds))
+            return users.create_user(username, hashed.decode(), conn=conn)
+
+        return register, lambda u, p: users.authenticate_user(u, p, conn) is not None
+    return make_client
+
+
+def setup_week11(rounds):
+    from database.schema import create_users_table
+    from services.auth_manager import AuthManager, SimpleHasher
+    from services.database_manager import DatabaseManager
+
+    db_path = os.path.abspath("bench.db")
+    setup_db = DatabaseManager(db_path)
+    create_users_table(setup_db.connect())
+    setup_db.close()
+
+    def make_client():
+        # sqlite3 connections can't cross threads, so one manager per client
+        auth = AuthManager(DatabaseManager(db_path), hasher=SimpleHasher(rounds=rounds))
+
+        def register(username, password):
+            auth.register_user(username, password)
+            return True
+
+        return register, lambda u, p: auth.login_user(u, p) is not None
+    return make_client
+
+
+STACK_SETUP = {
+    "week07_flatfile": setup_week07,
+    "week08_user_service": setup_week08,
+    "week10_users": setup_week10,
+    "week11_auth_manager": setup_week11,
+}
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(stack, operation, clients, latencies, errors, elapsed):
+    latencies_ms = sorted(round(latency * 1000, 3) for latency in latencies)
+    return {
+        "stack": stack,
+        "operation": operation,
+        "clients": clients,
+        "ops": len(latencies) + errors,
+        "errors": errors,
+        "seconds": round(elapsed, 4),
+        "throughput_ops_s": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "latency_ms": {
+            "p50": percentile(latencies_ms, 50),
+            "p90": percentile(latencies_ms, 90),
+            "p99": percentile(latencies_ms, 99),
+            "max": latencies_ms[-1] if latencies_ms else None,
+            "mean": round(sum(latencies_ms) / len(latencies_ms), 3) if latencies_ms else None,
+        },
+    }
+
+
+def run_phase(make_client, operation, usernames, clients):
+    """Run register or login for every username on `clients` threads."""
+    local = threading.local()
+    lock = threading.Lock()
+    latencies = []
+    errors = 0
+
+    def one(username):
+        nonlocal errors
+        if not hasattr(local, "client"):
+            local.client = make_client()
+        register, login = local.client
+        func = register if operation == "register" else login
+
+        start = time.perf_counter()
+        try:
+            ok = func(username, PASSWORD)
+        except Exception:
+            ok = False
+        latency = time.perf_counter() - start
+
+        with lock:
+            if ok:
+                latencies.append(latency)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(one, usernames))
+    return latencies, errors, time.perf_counter() - start
+
+
+def run_stack(stack, users, client_counts, rounds):
+    """Benchmark one stack in the current process (cwd = scratch dir)."""
+    sys.path.insert(0, str(STACK_DIRS[stack]))
+    # The console-oriented stacks print on every call; keep that out of the run
+    with contextlib.redirect_stdout(io.StringIO()):
+        make_client = STACK_SETUP[stack](rounds)
+        results = []
+        for clients in client_counts:
+            usernames = [f"c{clients}u{i}" for i in range(users)]
+            for operation in ("register", "login"):
+                latencies, errors, elapsed = run_phase(make_client, operation, usernames, clients)
+                results.append(summarize(stack, operation, clients, latencies, errors, elapsed))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=200, help="synthetic users per client count")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost used by every stack")
+    parser.add_argument("--stacks", nargs="+", choices=sorted(STACK_DIRS), default=sorted(STACK_DIRS))
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    parser.add_argument("--run-stack", help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_stack:
+        results = run_stack(args.run_stack, args.users, args.clients, args.rounds)
+        Path(args.result_file).write_text(json.dumps(results))
+        return
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "users": args.users,
+            "clients": args.clients,
+            "bcrypt_rounds": args.rounds,
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": [],
+        "failures": {},
+    }
+
+    for stack in args.stacks:
+        print(f"Benchmarking {stack}...", file=sys.stderr)
+        with tempfile.TemporaryDirectory(prefix=f"bench_{stack}_") as workdir:
+            result_file = Path(workdir) / "results.json"
+            proc = subprocess.run(
+                [sys.executable, str(Path(__file__).resolve()),
+                 "--run-stack", stack, "--result-file", str(result_file),
+                 "--users", str(args.users), "--rounds", str(args.rounds),
+                 "--clients", *map(str, args.clients)],
+                cwd=workdir, capture_output=True, text=True,
+            )
+            if proc.returncode != 0:
+                report["failures"][stack] = proc.stderr.strip().splitlines()[-1:]
+                continue
+            report["results"].extend(json.loads(result_file.read_text()))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()